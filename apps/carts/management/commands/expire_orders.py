@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.carts.models import Order
+from mongo_client.models.product.stock import order_lines, release_stock
+
+
+class Command(BaseCommand):
+    help = (
+        "Marca como expiradas las órdenes pendientes cuyo expires_at ya pasó y devuelve "
+        "su stock al inventario. Programar cada pocos minutos (p. ej. cron */5)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=200)
+        parser.add_argument("--dry-run", action="store_true", help="Solo cuenta las órdenes vencidas.")
+
+    def handle(self, *args, **options):
+        overdue = (
+            Order.objects.filter(status="pending", expires_at__lt=timezone.now())
+            .select_related("cart")
+            .order_by("id")
+        )
+        if options["dry_run"]:
+            self.stdout.write(f"{overdue.count()} órdenes vencidas.")
+            return
+
+        expired = 0
+        for order in overdue.iterator(chunk_size=options["batch_size"]):
+            # Condicional: si otro proceso (pago, admin) cambió la orden, no se toca
+            if not Order.objects.filter(id=order.id, status="pending").update(status="expired"):
+                continue
+            expired += 1
+            if order.cart:
+                release_stock(order_lines(order.cart.items.all()))
+
+        self.stdout.write(self.style.SUCCESS(f"{expired} órdenes expiradas, stock devuelto."))
@@ -10,7 +10,7 @@ from datetime import timedelta
 import secrets
 import string
 import uuid
-from ..mongo_utils import get_product_by_id
+from ..mongo_utils import get_product_by_id, get_products_by_ids
 
 
 def store_payment_proof(instance, filename):
@@ -32,11 +32,15 @@ class Cart(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     
     def update_totals(self):
-        items = self.items.all()
+        items = list(self.items.all())
 
         subtotal = Decimal('0.00')  # lo pagado (con descuentos)
         total = Decimal('0.00')     # el precio original sin descuentos
 
+        # Todos los productos del carrito en una sola consulta
+        # (quedan en el mapa de identidad del request para clean() y los serializers)
+        products = get_products_by_ids([item.product_id for item in items])
+
         for item in items:
             subtotal += item.total_price  # ya con descuentos
 
@@ -44,7 +48,7 @@ class Cart(models.Model):
             if item.combo and item.price == Decimal("0.00"):
                 continue
 
-            product = get_product_by_id(item.product_id)
+            product = products.get(str(item.product_id))
             if not product:
                 base_price = item.price  # fallback
             else:
@@ -1,6 +1,6 @@
 from rest_framework import serializers
 from .models import Cart, CartItem, CheckoutSession, Order
-from ..mongo_utils import get_product_by_id
+from ..mongo_utils import get_product_by_id, get_products_by_ids
 from apps.stores.serializers import StoreSerializer
 from apps.stores.models import Combo
 
@@ -79,6 +79,12 @@ class CartSerializer(serializers.ModelSerializer):
             'items_subtotal', 'total', 'items', 'created_at', 'updated_at'
         ]
 
+    def to_representation(self, instance):
+        # Carga los productos de todos los ítems en una consulta; los
+        # CartItemSerializer los toman luego del mapa de identidad del request.
+        get_products_by_ids([item.product_id for item in instance.items.all()])
+        return super().to_representation(instance)
+
     def get_store_logo(self, obj):
         logo = obj.store.logo
         if not logo or not hasattr(logo, 'url'):
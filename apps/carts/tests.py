@@ -1,3 +1,65 @@
-from django.test import TestCase
+import tempfile
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from bson import ObjectId
+from django.test import TestCase, override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.mongo_utils import get_product_by_id, product_identity_map
+from apps.stores.models import Store
+from apps.testing import FakeProducts
+from apps.users.models import User
+from .views import CartAPIView
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ProductIdentityMapTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user("comprador", "secret", name="Comprador", cellphone="3000000001")
+        self.store = Store.objects.create(name="Tienda")
+        self.product_id = ObjectId()
+        self.products = FakeProducts([{
+            "_id": self.product_id,
+            "store_id": self.store.id,
+            "name": "Camisa",
+            "sku": "CAM-1",
+            "price": 10000,
+            "stock": 5,
+            "variants": [],
+        }])
+        patcher = mock.patch("apps.mongo_utils.get_mongo_db",
+                             return_value=SimpleNamespace(products=self.products))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_cart_post_loads_product_once(self):
+        request = APIRequestFactory().post("/api/cart/cart/", {
+            "store_id": self.store.id,
+            "product_id": str(self.product_id),
+            "sku": "CAM-1",
+            "quantity": 2,
+        }, format="json")
+        force_authenticate(request, user=self.user)
+
+        with product_identity_map() as identity_map:
+            response = CartAPIView.as_view()(request)
+
+        self.assertEqual(response.status_code, 200)
+        # La vista, CartItem.clean, update_totals y CartSerializer comparten una lectura
+        self.assertEqual(identity_map.stats()["queries"], 1)
+        self.assertEqual(identity_map.stats()["misses"], 1)
+        self.assertGreater(identity_map.stats()["hits"], 0)
+        self.assertEqual(len(self.products.calls), 1)
+
+    def test_callers_get_independent_copies(self):
+        with product_identity_map():
+            first = get_product_by_id(str(self.product_id))
+            first["stock"] = 0
+            first["variants"].append({"sku": "X"})
+            second = get_product_by_id(str(self.product_id))
+
+        self.assertEqual(second["stock"], 5)
+        self.assertEqual(second["variants"], [])
+        self.assertEqual(len(self.products.calls), 1)
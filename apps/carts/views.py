@@ -5,10 +5,11 @@ from django.contrib.auth import get_user_model
 from bson import ObjectId
 from .models import Cart, CartItem, CheckoutSession, Order, Combo
 from .serializers import CartSerializer, CheckoutSessionSerializer, OrderSerializer, OrderDetailSerializer
-from ..mongo_utils import get_product_by_id
+from ..mongo_utils import forget_products, get_product_by_id, get_products_by_ids
 from decimal import Decimal, ROUND_HALF_UP
 from datetime import datetime, date
 from mongo_client.models.product.products import apply_discount
+from mongo_client.models.product.stock import StockError, order_lines, reserve_stock, release_stock
 import sys
 from rest_framework.permissions import IsAuthenticated
 from django.core.exceptions import ValidationError
@@ -242,8 +243,11 @@ class UpdateCartItemQuantityAPIView(APIView):
                 cart.update_totals()
                 return Response(CartSerializer(cart, context={'request': request}).data, status=200)
 
-            for item in combo_items.exclude(sku=data['sku']):
-                product = get_product_by_id(item.product_id)
+            component_items = list(combo_items.exclude(sku=data['sku']))
+            products = get_products_by_ids([item.product_id for item in component_items])
+
+            for item in component_items:
+                product = products.get(str(item.product_id))
                 if not product:
                     return Response({"error": f"Producto '{item.product_id}' no encontrado."}, status=404)
 
@@ -503,9 +507,6 @@ class CreateOrderAPIView(APIView):
         except CheckoutSession.DoesNotExist:
             return Response({"error": "Checkout session not found."}, status=404)
 
-        if Order.objects.filter(cart=session.cart, status__in=['pending', 'paid']).exists():
-            return Response({"error": "Order already exists for this cart."}, status=400)
-
         try:
             payment_method = PaymentMethod.objects.get(id=payment_method_id, store=session.store, is_active=True)
         except PaymentMethod.DoesNotExist:
@@ -513,28 +514,55 @@ class CreateOrderAPIView(APIView):
 
         expires_at = timezone.now() + timedelta(hours=2)
 
-        order = Order.objects.create(
-            user=user,
-            store=session.store,
-            cart=session.cart,
-            payment_method=payment_method,
-            items_subtotal=session.items_subtotal,
-            shipping_cost=session.shipping_cost,
-            discount_total=session.discount_total,
-            total=session.total,
-            coupon=session.coupon,
-            notes=notes,
-            expires_at=expires_at,
-        )
+        reserved = []
+        try:
+            with transaction.atomic():
+                # Bloquear el carrito serializa los checkouts del mismo carrito: un
+                # doble envío espera aquí y luego ve la orden creada por el primero.
+                Cart.objects.select_for_update().get(id=session.cart_id)
+
+                if Order.objects.filter(cart=session.cart, status__in=['pending', 'paid']).exists():
+                    return Response({"error": "Order already exists for this cart."}, status=400)
+
+                # ✅ Descontar inventario (todo o nada, ver mongo_client/models/product/stock.py)
+                lines = order_lines(session.cart.items.all())
+                try:
+                    reserve_stock(lines)
+                except StockError as e:
+                    return Response({
+                        "error": str(e),
+                        "product_id": e.line["product_id"],
+                        "sku": e.line["sku"],
+                    }, status=409)
+                reserved = lines
+                forget_products(line["product_id"] for line in lines)
+
+                order = Order.objects.create(
+                    user=user,
+                    store=session.store,
+                    cart=session.cart,
+                    payment_method=payment_method,
+                    items_subtotal=session.items_subtotal,
+                    shipping_cost=session.shipping_cost,
+                    discount_total=session.discount_total,
+                    total=session.total,
+                    coupon=session.coupon,
+                    notes=notes,
+                    expires_at=expires_at,
+                )
 
-        # ✅ Desactivar el carrito
-        session.cart.is_active = False
-        session.cart.save(update_fields=["is_active"])
+                # ✅ Desactivar el carrito
+                session.cart.is_active = False
+                session.cart.save(update_fields=["is_active"])
 
-        # ✅ Marcar cupón como usado si aplica
-        if session.coupon:
-            session.coupon.used_count += 1
-            session.coupon.save(update_fields=["used_count"])
+                # ✅ Marcar cupón como usado si aplica
+                if session.coupon:
+                    session.coupon.used_count += 1
+                    session.coupon.save(update_fields=["used_count"])
+        except Exception:
+            # La orden no se confirmó (incluido un fallo en el commit): devolver el stock reservado
+            release_stock(reserved)
+            raise
 
         return Response({
             "message": "Order created.",
@@ -619,10 +647,31 @@ class OrderAdminDetailView(APIView):
         if new_status not in ['pending', 'paid', 'processing', 'shipped', 'delivered', 'cancelled']:
             return Response({"error": "Estado inválido."}, status=400)
 
-        order.status = new_status
+        # Cancelar devuelve el stock de la orden; reactivarla lo vuelve a descontar.
+        # El cambio es condicional al estado leído (compare-and-set): si otro
+        # proceso (p. ej. expire_orders) lo cambió entretanto, no se toca stock.
+        released = ("cancelled", "expired")
+        releasing = new_status in released and order.status not in released
+        reserving = new_status not in released and order.status in released
+        lines = order_lines(order.cart.items.all()) if order.cart and (releasing or reserving) else []
+
+        if reserving:
+            try:
+                reserve_stock(lines)
+            except StockError as e:
+                return Response({"error": str(e)}, status=409)
+
+        changes = {"status": new_status}
         if new_status != "pending":
-            order.expires_at = None  # Limpiar expiración si ya cambió estado
-        order.save()
+            changes["expires_at"] = None  # Limpiar expiración si ya cambió estado
+        updated = Order.objects.filter(id=order.id, status=order.status).update(**changes)
+
+        if updated != 1:
+            if reserving:
+                release_stock(lines)
+            return Response({"error": "La orden cambió de estado; vuelve a cargarla."}, status=409)
+        if releasing:
+            release_stock(lines)
 
         return Response({"success": "Estado actualizado correctamente."})
     
@@ -648,9 +697,12 @@ class AddComboToCartAPIView(APIView):
         # 🆔 Genera un ID único para esta instancia del combo
         combo_instance_id = uuid.uuid4()
 
-        for item in combo.items.all():
+        combo_items = list(combo.items.all())
+        products = get_products_by_ids([item.product_id for item in combo_items])
+
+        for item in combo_items:
             product_id = str(item.product_id)
-            product = get_product_by_id(product_id)
+            product = products.get(product_id)
             if not product:
                 return Response({"error": f"Producto con ID {product_id} no encontrado."}, status=400)
 
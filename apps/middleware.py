@@ -0,0 +1,15 @@
+from .mongo_utils import product_identity_map
+
+
+class ProductIdentityMapMiddleware:
+    """
+    Abre un mapa de identidad de productos de MongoDB por request,
+    de modo que cada producto se lee como máximo una vez por request.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with product_identity_map():
+            return self.get_response(request)
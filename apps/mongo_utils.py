@@ -1,27 +1,140 @@
 # mongo_utils.py
-import pymongo
+import copy
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
 from django.conf import settings
 from bson import ObjectId  # Importa ObjectId
 from pymongo.errors import PyMongoError
 from bson import ObjectId, errors as bson_errors
+from mongo_client.connection import get_client, get_db
+
+logger = logging.getLogger(__name__)
 
 def get_mongo_client():
-    return pymongo.MongoClient(
-        settings.MONGO_URI,
-        serverSelectionTimeoutMS=5000
-    )
+    # Cliente compartido del proceso (no crear uno nuevo por consulta)
+    return get_client()
 
 def get_mongo_db():
-    return get_mongo_client()[settings.MONGO_DB_NAME]
+    return get_db()
+
+
+# Mapa de identidad de productos por request.
+# Durante un request (ver apps.middleware.ProductIdentityMapMiddleware) cada
+# producto se lee de MongoDB como máximo una vez: la vista, CartItem.clean,
+# Cart.update_totals y los serializers comparten la misma lectura.
+# El documento guardado en el mapa no sale nunca: cada llamador recibe su
+# propia copia, así lo que uno modifique no se ve en los demás.
+# Fuera de un request (shell, comandos) no hay mapa y se consulta siempre.
+
+class ProductIdentityMap:
+    def __init__(self):
+        self.products = {}  # product_id -> documento completo | None
+        self.hits = 0
+        self.misses = 0
+        self.queries = 0
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "queries": self.queries,
+            "size": len(self.products),
+        }
+
+
+_identity_map = ContextVar("product_identity_map", default=None)
+
+
+@contextmanager
+def product_identity_map():
+    identity_map = ProductIdentityMap()
+    token = _identity_map.set(identity_map)
+    try:
+        yield identity_map
+    finally:
+        _identity_map.reset(token)
+
+
+def get_product_identity_map():
+    return _identity_map.get()
+
+
+def forget_products(product_ids):
+    """
+    Saca productos del mapa del request (p. ej. después de modificar su stock).
+    """
+    identity_map = _identity_map.get()
+    if identity_map is None:
+        return
+    for product_id in product_ids:
+        identity_map.products.pop(str(product_id), None)
+
 
 def get_product_by_id(product_id):
+    identity_map = _identity_map.get()
+    key = str(product_id)
+
+    if identity_map is not None and key in identity_map.products:
+        identity_map.hits += 1
+        return copy.deepcopy(identity_map.products[key])
+
     try:
         # Si el ID no es un ObjectId válido (como "combo-1"), retorna None
         if not ObjectId.is_valid(product_id):
             return None
 
         db = get_mongo_db()
-        return db.products.find_one({"_id": ObjectId(product_id)})
-    except (PyMongoError, bson_errors.InvalidId, TypeError) as e:
-        print(f"MongoDB Error: {str(e)}")
-        return None
\ No newline at end of file
+        product = db.products.find_one({"_id": ObjectId(product_id)})
+    except (PyMongoError, bson_errors.InvalidId, TypeError):
+        logger.exception("Error consultando el producto %s en MongoDB", product_id)
+        return None
+
+    if identity_map is not None:
+        identity_map.misses += 1
+        identity_map.queries += 1
+        identity_map.products[key] = copy.deepcopy(product)
+    return product
+
+def get_products_by_ids(product_ids, projection=None):
+    """
+    Carga varios productos en una sola consulta ($in).
+    Retorna un dict {product_id: documento | None} con una entrada por cada id
+    recibido; los ids inválidos (como "combo-1") o inexistentes quedan en None.
+
+    Los productos que ya están en el mapa del request no se vuelven a pedir.
+    Solo los documentos completos (sin projection) se guardan en el mapa.
+    """
+    identity_map = _identity_map.get()
+    keys = [str(pid) for pid in product_ids]
+    result = {key: None for key in keys}
+
+    # ObjectId -> ids tal como los pidió el llamador
+    wanted = {}
+    for key in keys:
+        if identity_map is not None and key in identity_map.products:
+            identity_map.hits += 1
+            result[key] = copy.deepcopy(identity_map.products[key])
+        elif ObjectId.is_valid(key):
+            wanted.setdefault(ObjectId(key), []).append(key)
+    if not wanted:
+        return result
+
+    try:
+        db = get_mongo_db()
+        for product in db.products.find({"_id": {"$in": list(wanted)}}, projection):
+            for key in wanted.get(product["_id"], []):
+                result[key] = product
+    except PyMongoError:
+        logger.exception("Error consultando productos en MongoDB")
+        return result
+
+    if identity_map is not None:
+        identity_map.queries += 1
+        identity_map.misses += sum(len(ids) for ids in wanted.values())
+        if projection is None:
+            for ids in wanted.values():
+                for key in ids:
+                    identity_map.products[key] = copy.deepcopy(result[key])
+
+    return result
@@ -5,5 +5,5 @@ class StoresConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.stores'
     
-    # def ready(self):
-    #     import apps.stores.signals  # Esto conecta las señales
+    def ready(self):
+        import apps.stores.signals  # Esto conecta las señales
@@ -0,0 +1,56 @@
+import re
+import unicodedata
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+# Copia congelada de mongo_client/utils/text.py (suggest_keys) al momento de
+# esta migración: un cambio posterior en ese módulo no debe alterarla.
+MIN_PREFIX = 2
+MAX_PREFIX = 15
+
+
+def suggest_keys(value):
+    value = unicodedata.normalize('NFKD', str(value or ''))
+    value = ''.join(c for c in value if not unicodedata.combining(c))
+    keys = set()
+    for token in re.findall(r'\w+', value.lower()):
+        token = token[:MAX_PREFIX]
+        for size in range(MIN_PREFIX, len(token) + 1):
+            keys.add(token[:size])
+    return sorted(keys)
+
+
+def fill_suggest_keys(apps, schema_editor):
+    Store = apps.get_model('stores', 'Store')
+    stores = []
+    for store in Store.objects.only('id', 'name').iterator(chunk_size=500):
+        store.suggest_keys = suggest_keys(store.name)
+        stores.append(store)
+        if len(stores) >= 500:
+            Store.objects.bulk_update(stores, ['suggest_keys'])
+            stores = []
+    if stores:
+        Store.objects.bulk_update(stores, ['suggest_keys'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0038_alter_shippingmethod_base_cost_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='store',
+            name='suggest_keys',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=20), blank=True, default=list, editable=False, size=None),
+        ),
+        migrations.AddIndex(
+            model_name='store',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['suggest_keys'], name='store_suggest_keys_gin'),
+        ),
+        migrations.RunPython(fill_suggest_keys, migrations.RunPython.noop),
+    ]
@@ -12,10 +12,14 @@ from uuid import uuid4
 import uuid
 from django.core.validators import MaxLengthValidator
 from django.contrib.gis.db import models as geomodels
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.core.cache import cache
 
 from django.core.exceptions import ValidationError
 
 from ..mongo_utils import get_product_by_id
+from mongo_client.utils.text import suggest_keys
 
 
 
@@ -94,6 +98,14 @@ class Store(models.Model):
     total_visits = models.PositiveIntegerField(default=0)
     location = geomodels.PointField(null=True, blank=True, geography=True)
 
+    # Prefijos normalizados del nombre para el autocompletado (apps/stores/suggest.py)
+    suggest_keys = ArrayField(models.CharField(max_length=20), default=list, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=["suggest_keys"], name="store_suggest_keys_gin"),
+        ]
+
     def save(self, *args, **kwargs):
             # Si hay un NIT y no está vacío, marcamos como verificada
             if self.nit and self.nit.strip():
@@ -103,6 +115,11 @@ class Store(models.Model):
             super().save(*args, **kwargs)
         
     def save(self, *args, **kwargs):
+        self.suggest_keys = suggest_keys(self.name)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "name" in update_fields:
+            kwargs["update_fields"] = set(update_fields) | {"suggest_keys"}
+
         if not self.slug:
             unique_slug = str(uuid.uuid4())[:20]  # 8 caracteres aleatorios
             while Store.objects.filter(slug=unique_slug).exists():
@@ -163,6 +180,12 @@ class StoreSchedule(models.Model):
 # 6	    128GB	    Galaxy S9	1
 # Aunque ambas se llaman "128GB", tienen distintos parent, así que no violan la restricción.
 
+def category_names_cache_key(store_id):
+    # {category_id: name} de las categorías de productos de una tienda
+    # (usado por ProductSerializer.get_category_name)
+    return f"category_names:{store_id}"
+
+
 class CategoryProduct(models.Model):
     name = models.CharField(max_length=100)
     store = models.ForeignKey(Store, on_delete=models.CASCADE, related_name="categories")
@@ -183,6 +206,13 @@ class CategoryProduct(models.Model):
                 counter += 1
             self.slug = slug
         super().save(*args, **kwargs)
+        cache.delete(category_names_cache_key(self.store_id))
+
+    def delete(self, *args, **kwargs):
+        store_id = self.store_id
+        result = super().delete(*args, **kwargs)
+        cache.delete(category_names_cache_key(store_id))
+        return result
 
     def __str__(self):
         return f"{self.name} ({self.store.name})"   
@@ -17,7 +17,7 @@ from django.conf import settings
 from apps.users.models import User
 from django.core.validators import MaxLengthValidator
 from django.contrib.gis.geos import Point
-from ..mongo_utils import get_product_by_id
+from ..mongo_utils import get_product_by_id, get_products_by_ids
 
 class StoreScheduleSerializer(serializers.ModelSerializer):
     day_display = serializers.SerializerMethodField()
@@ -510,6 +510,10 @@ class ComboSerializer(serializers.ModelSerializer):
             return obj.image.url  # esto da la ruta relativa: /media/...
         return None
 
+# Campos de producto que necesita ComboItemSerializer
+COMBO_PRODUCT_PROJECTION = {"name": 1, "media": 1, "variants": 1, "stock": 1}
+
+
 class ComboItemSerializer(serializers.ModelSerializer):
     product_name = serializers.SerializerMethodField()
     product_image = serializers.SerializerMethodField()
@@ -530,17 +534,26 @@ class ComboItemSerializer(serializers.ModelSerializer):
             'stock', 
         ]
 
+    def get_product(self, obj):
+        # ComboDetailSerializer deja los productos precargados en el contexto
+        products = self.context.get("products")
+        if products is not None:
+            return products.get(str(obj.product_id))
+        return get_product_by_id(str(obj.product_id))
+
     def get_product_name(self, obj):
-        product = get_product_by_id(str(obj.product_id))
+        product = self.get_product(obj)
         return product.get("name") if product else None
 
     def get_product_image(self, obj):
-        product = get_product_by_id(str(obj.product_id))
+        product = self.get_product(obj)
+        if not product:
+            return None
         media = product.get("media", [])
         return media[0].get("url") if media else None
 
     def get_available_variants(self, obj):
-        product = get_product_by_id(str(obj.product_id))
+        product = self.get_product(obj)
         if not product:
             return []
 
@@ -555,7 +568,7 @@ class ComboItemSerializer(serializers.ModelSerializer):
         ]
 
     def get_stock(self, obj):
-            product = get_product_by_id(str(obj.product_id))
+            product = self.get_product(obj)
             if not product:
                 return 0
 
@@ -574,6 +587,15 @@ class ComboDetailSerializer(serializers.ModelSerializer):
         model = Combo
         fields = ['id','store', 'name', 'description', 'image', 'price', 'items']
 
+    def to_representation(self, instance):
+        # Una sola consulta a MongoDB para todos los productos del combo,
+        # sin importar cuántos ítems tenga.
+        self.context["products"] = get_products_by_ids(
+            [item.product_id for item in instance.items.all()],
+            projection=COMBO_PRODUCT_PROJECTION,
+        )
+        return super().to_representation(instance)
+
     def get_image(self, obj):
         if obj.image:
             return obj.image.url  # esto da la ruta relativa: /media/...
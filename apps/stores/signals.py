@@ -1,11 +1,22 @@
 # en signals.py
-from django.db.models.signals import post_save
+from django.db.models.signals import post_init, post_save
 from django.dispatch import receiver
-from mongo_client.models.post.post import update_post
+from mongo_client.store_sync import schedule_store_sync, store_embed_snapshot
 from apps.stores.models import Store
 
-@receiver(post_save, sender=Store)
-def update_embedded_store_data(sender, instance, **kwargs):
-    update_post(instance)
-    
 
+@receiver(post_init, sender=Store)
+def remember_embedded_store_data(sender, instance, **kwargs):
+    # Copia de los campos embebidos en MongoDB tal como se cargaron
+    instance._embed_snapshot = store_embed_snapshot(instance)
+
+
+@receiver(post_save, sender=Store)
+def update_embedded_store_data(sender, instance, created, **kwargs):
+    snapshot = store_embed_snapshot(instance)
+    previous = getattr(instance, "_embed_snapshot", None)
+    # Solo si cambió algo que productos/posts tienen copiado
+    # (None: no se conocían los valores, se sincroniza por las dudas)
+    if not created and (snapshot is None or previous is None or snapshot != previous):
+        schedule_store_sync(instance.id)
+    instance._embed_snapshot = snapshot
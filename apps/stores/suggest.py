@@ -0,0 +1,82 @@
+"""
+Autocompletado de nombres de productos y tiendas para la caja de búsqueda.
+
+Productos (MongoDB, campo "suggest") y tiendas (Postgres, Store.suggest_keys)
+guardan al escribirse los prefijos de cada palabra del nombre normalizado
+(ver mongo_client/utils/text.py). Una sugerencia es una consulta de
+igualdad sobre esos prefijos, resuelta con índice (multikey en MongoDB, GIN
+en Postgres), sin regex ni icontains. Los prefijos más pedidos quedan en una
+cache LRU en memoria del proceso con TTL corto.
+"""
+import threading
+
+from cachetools import TTLCache
+
+from mongo_client.models.product.products import products_collection
+from mongo_client.utils.text import normalize_text, suggest_tokens
+from .models import Store
+
+SUGGEST_LIMIT = 8
+SUGGEST_MAX_LIMIT = 20
+SUGGEST_CACHE_TTL = 60       # segundos
+SUGGEST_CACHE_SIZE = 2048    # prefijos distintos en memoria
+# Se piden más candidatos de los que se devuelven para preferir los nombres
+# que empiezan por el texto buscado.
+CANDIDATES_FACTOR = 3
+
+_cache = TTLCache(maxsize=SUGGEST_CACHE_SIZE, ttl=SUGGEST_CACHE_TTL)
+_lock = threading.Lock()
+
+
+def rank_names(rows, query, limit):
+    """
+    Primero los nombres que empiezan por query, luego los más cortos.
+    """
+    rows.sort(key=lambda row: (not normalize_text(row["name"]).startswith(query), len(row["name"])))
+    return rows[:limit]
+
+
+def suggest_products(tokens, query, limit):
+    # El prefijo más largo primero: es el más selectivo para el índice
+    keys = sorted(set(tokens), key=len, reverse=True)
+    docs = products_collection.find(
+        {"suggest": {"$all": keys}, "is_active": True},
+        {"name": 1, "slug": 1, "store_id": 1},
+    ).limit(limit * CANDIDATES_FACTOR)
+    rows = [{"id": str(d["_id"]), "name": d["name"], "slug": d.get("slug"), "store_id": d.get("store_id")}
+            for d in docs]
+    return rank_names(rows, query, limit)
+
+
+def suggest_stores(tokens, query, limit):
+    rows = list(
+        Store.objects.filter(is_active=True, suggest_keys__contains=list(set(tokens)))
+        .values("id", "name", "slug")[:limit * CANDIDATES_FACTOR]
+    )
+    return rank_names(rows, query, limit)
+
+
+def suggest(text, limit=SUGGEST_LIMIT):
+    """
+    {"products": [...], "stores": [...]} con hasta limit nombres de cada uno.
+    Vacío si ninguna palabra llega a SUGGEST_MIN_PREFIX letras (no hay claves
+    tan cortas); las palabras más cortas de la consulta solo afectan el orden.
+    """
+    query = normalize_text(text)
+    tokens = suggest_tokens(query)
+    if not tokens:
+        return {"products": [], "stores": []}
+
+    key = (query, limit)
+    with _lock:
+        cached = _cache.get(key)
+    if cached is not None:
+        return cached
+
+    result = {
+        "products": suggest_products(tokens, query, limit),
+        "stores": suggest_stores(tokens, query, limit),
+    }
+    with _lock:
+        _cache[key] = result
+    return result
@@ -1,3 +1,47 @@
-from django.test import TestCase
+import tempfile
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from bson import ObjectId
+from django.test import TestCase, override_settings
+
+from apps.testing import FakeProducts
+
+from .models import Store, Combo, ComboItem
+from .serializers import ComboDetailSerializer
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ComboDetailSerializerTests(TestCase):
+
+    def setUp(self):
+        self.store = Store.objects.create(name="Tienda")
+
+    def build_combo(self, size):
+        combo = Combo.objects.create(store=self.store, name=f"Combo {size}", price=1000)
+        docs = []
+        items = []
+        for index in range(size):
+            product_id = ObjectId()
+            docs.append({"_id": product_id, "name": f"Producto {index}", "media": [],
+                         "variants": [], "stock": 3})
+            # bulk_create: sin ComboItem.clean, que consulta MongoDB por ítem
+            items.append(ComboItem(combo=combo, product_id=str(product_id), sku=f"SKU-{index}"))
+        ComboItem.objects.bulk_create(items)
+        return combo, FakeProducts(docs)
+
+    def serialize(self, combo, products):
+        with mock.patch("apps.mongo_utils.get_mongo_db",
+                        return_value=SimpleNamespace(products=products)):
+            return ComboDetailSerializer(combo).data
+
+    def test_one_mongo_query_whatever_the_item_count(self):
+        for size in (1, 12):
+            with self.subTest(items=size):
+                combo, products = self.build_combo(size)
+                data = self.serialize(combo, products)
+
+                self.assertEqual([call[0] for call in products.calls], ["find"])
+                self.assertEqual(len(data["items"]), size)
+                self.assertEqual(data["items"][0]["product_name"], "Producto 0")
+                self.assertEqual(data["items"][0]["stock"], 3)
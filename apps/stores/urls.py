@@ -17,6 +17,7 @@ from .views import (StoreListView,
                     ShippingMethodsFromUserLocationAPIView,
                     StorePaymentMethodsAPIView,
                     search_products_and_stores,
+                    suggest_names,
                     ComboCreateView,
                     StoreComboListAPIView,
                     ComboDetailAPIView,
@@ -75,6 +76,7 @@ urlpatterns = [
     path('payment-methods/', StorePaymentMethodsAPIView.as_view(), name='payment-methods'),
     
     path('search/', search_products_and_stores, name='payment-methods'),
+    path('search/suggest/', suggest_names, name='search-suggest'),
 
     path('create-combo/', ComboCreateView.as_view(), name='combo-create'),
 
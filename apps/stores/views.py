@@ -32,6 +32,7 @@ from django.shortcuts import get_object_or_404
 from rest_framework.views import APIView
 from rest_framework import status
 from .filters import StoreFilter
+from .suggest import suggest, SUGGEST_LIMIT, SUGGEST_MAX_LIMIT
 from datetime import datetime
 from django.utils import timezone
 from math import radians, cos, sin, asin, sqrt
@@ -48,7 +49,6 @@ from collections import Counter
 import random
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt  # Importa esto para desactivar CSRF
-from pymongo import MongoClient
 from django.conf import settings
 from django.db import transaction
 from .models import ShippingZone, ShippingMethodZone, ShippingMethod
@@ -719,17 +719,13 @@ def delete_category(request, category_id):
                 'subcategories_count': category.subcategories.count()
             }, status=400)
 
-        # 4. Conectar a MongoDB y verificar productos
-        client = MongoClient(settings.MONGO_URI)
-        db = client[settings.MONGO_DB_NAME]
-        
+        # 4. Verificar productos en MongoDB (cliente compartido del proceso)
         # Consulta para productos que usan esta categoría
-        product_count = db.products.count_documents({
+        product_count = products_collection.count_documents({
             'category_id': str(category.id) 
         })
         
         if product_count > 0:
-            client.close()
             return Response({
                 'error': 'No se puede eliminar la categoría porque tiene productos asociados.',
                 'product_count': product_count
@@ -739,12 +735,11 @@ def delete_category(request, category_id):
         category.delete()
         
         # Opcional: Actualizar productos en MongoDB para quitar la referencia
-        # db.products.update_many(
+        # products_collection.update_many(
         #     {'category_id': str(category.id)},
         #     {'$set': {'category_id': None}}
         # )
         
-        client.close()
         return Response({'success': 'Categoría eliminada correctamente.'}, status=200)
 
     except CategoryProduct.DoesNotExist:
@@ -881,6 +876,19 @@ class StorePaymentMethodsAPIView(APIView):
 class CustomPagination(PageNumberPagination):
     page_size = 10
 
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def suggest_names(request):
+    """
+    Autocompletado de la caja de búsqueda: ?q=cami&limit=8
+    """
+    try:
+        limit = int(request.GET.get("limit", SUGGEST_LIMIT))
+    except ValueError:
+        return Response({"error": "limit debe ser un número."}, status=400)
+    limit = max(1, min(limit, SUGGEST_MAX_LIMIT))
+    return Response(suggest(request.GET.get("q", ""), limit), status=200)
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def search_products_and_stores(request):
@@ -920,7 +928,8 @@ def search_products_and_stores(request):
             page_size=page_size,
             filters=product_filters,
             lat=lat,
-            lon=lon 
+            lon=lon,
+            with_count=False  # el buscador no usa el total
         )
         processed = process_products_with_images(products_data["results"], request)
         products_data["results"] = processed
@@ -1049,7 +1058,7 @@ class StoreComboListAPIView(ListAPIView):
 
 class ComboDetailAPIView(RetrieveAPIView):
     permission_classes = [AllowAny]
-    queryset = Combo.objects.filter(is_active=True)
+    queryset = Combo.objects.filter(is_active=True).prefetch_related('items')
     serializer_class = ComboDetailSerializer
     lookup_field = 'id'  # o 'pk' si lo prefieres
 
@@ -0,0 +1,23 @@
+"""
+Utilidades compartidas por los tests de las apps.
+"""
+import copy
+
+
+class FakeProducts:
+    """
+    Colección products en memoria que registra cada consulta.
+    Devuelve copias, como un cursor de pymongo.
+    """
+
+    def __init__(self, docs):
+        self.docs = {doc["_id"]: doc for doc in docs}
+        self.calls = []
+
+    def find_one(self, query, projection=None):
+        self.calls.append(("find_one", query))
+        return copy.deepcopy(self.docs.get(query["_id"]))
+
+    def find(self, query, projection=None):
+        self.calls.append(("find", query))
+        return [copy.deepcopy(self.docs[_id]) for _id in query["_id"]["$in"] if _id in self.docs]
@@ -16,8 +16,6 @@ import os
 BASE_DIR = Path(__file__).resolve().parent.parent
 import mongoengine
 from datetime import timedelta
-import pymongo
-from pymongo import MongoClient
 
 from dotenv import load_dotenv
 from dotenv import load_dotenv
@@ -65,6 +63,7 @@ INSTALLED_APPS = [
     'apps.stores',
     'apps.carts',
     'apps.notification',
+    'mongo_client',  # comandos de mantenimiento de MongoDB (management/commands)
     'import_export',
     
 ]
@@ -78,6 +77,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    'apps.middleware.ProductIdentityMapMiddleware',
 ]
 
 ROOT_URLCONF = 'marketplace.urls'
@@ -130,8 +130,13 @@ DATABASES['default']['ENGINE'] = 'django.contrib.gis.db.backends.postgis'
 MONGO_URI = os.getenv("MONGO_URI")
 MONGO_DB_NAME = os.getenv("MONGO_DB_NAME")
 
-mongo_client = MongoClient(MONGO_URI)
-mongo_db = mongo_client[MONGO_DB_NAME]
+# Pool de conexiones de MongoDB (un cliente por proceso, ver mongo_client/connection.py)
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "0")) or None
+MONGO_READ_PREFERENCE = os.getenv("MONGO_READ_PREFERENCE", "primary")
 
 
 
@@ -1,5 +1,98 @@
-from pymongo import MongoClient
+import os
+import threading
+
+from pymongo import MongoClient, ReadPreference
 from django.conf import settings
 
-client = MongoClient(settings.MONGO_URI)
-mongo_db = client[settings.MONGO_DB_NAME]
+# Un solo MongoClient por proceso. pymongo ya mantiene su propio pool de
+# conexiones, así que crear un cliente por consulta (nuevo pool + handshake de
+# selección de servidor) es lo más caro que podemos hacer.
+#
+# El cliente se crea la primera vez que se usa (no al importar el módulo) y se
+# vuelve a crear si el proceso cambió de PID: los workers de gunicorn hacen
+# fork y pymongo no es fork-safe.
+
+READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
+
+_client = None
+_client_pid = None
+_lock = threading.Lock()
+
+
+def get_client_options():
+    """
+    Opciones del pool leídas desde settings (todas opcionales).
+    """
+    read_preference = getattr(settings, "MONGO_READ_PREFERENCE", "primary")
+    return {
+        "maxPoolSize": getattr(settings, "MONGO_MAX_POOL_SIZE", 100),
+        "minPoolSize": getattr(settings, "MONGO_MIN_POOL_SIZE", 0),
+        "serverSelectionTimeoutMS": getattr(settings, "MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000),
+        "connectTimeoutMS": getattr(settings, "MONGO_CONNECT_TIMEOUT_MS", 5000),
+        "socketTimeoutMS": getattr(settings, "MONGO_SOCKET_TIMEOUT_MS", None),
+        "read_preference": READ_PREFERENCES.get(read_preference, ReadPreference.PRIMARY),
+    }
+
+
+def get_client():
+    global _client, _client_pid
+
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid:
+        return _client
+
+    with _lock:
+        if _client is None or _client_pid != pid:
+            # Tras un fork no se cierra el cliente del padre: sus sockets
+            # pertenecen al proceso padre. Solo se descarta la referencia.
+            _client = MongoClient(settings.MONGO_URI, **get_client_options())
+            _client_pid = pid
+    return _client
+
+
+def get_db():
+    return get_client()[settings.MONGO_DB_NAME]
+
+
+def close_client():
+    global _client, _client_pid
+
+    with _lock:
+        if _client is not None and _client_pid == os.getpid():
+            _client.close()
+        _client = None
+        _client_pid = None
+
+
+class LazyCollection:
+    """
+    Referencia a una colección que se resuelve contra el cliente del proceso
+    actual en cada uso. Permite seguir declarando
+    `products_collection = mongo_db["products"]` a nivel de módulo.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __getattr__(self, attr):
+        return getattr(get_db()[self.name], attr)
+
+    def __repr__(self):
+        return f"LazyCollection({self.name!r})"
+
+
+class LazyDatabase:
+    def __getitem__(self, name):
+        return LazyCollection(name)
+
+    def __getattr__(self, attr):
+        return getattr(get_db(), attr)
+
+
+mongo_db = LazyDatabase()
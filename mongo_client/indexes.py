@@ -0,0 +1,207 @@
+"""
+Índices declarados de MongoDB.
+
+Esta es la única fuente de verdad de los índices de las colecciones de
+mongo_client. Se aplican con:
+
+    python manage.py ensure_mongo_indexes           # crea los que faltan
+    python manage.py ensure_mongo_indexes --check   # solo reporta diferencias
+
+Las diferencias se comparan por campos del índice (no por nombre), así que
+un índice creado a mano con otro nombre cuenta como existente.
+"""
+from pymongo import ASCENDING, DESCENDING, GEOSPHERE, TEXT
+from pymongo.errors import PyMongoError
+
+from .connection import get_db
+
+TEXT_KEY = "$text"
+
+INDEXES = {
+    "products": [
+        {"name": "store_location_2dsphere", "keys": [("store.location", GEOSPHERE)]},
+        {
+            "name": "products_text",
+            "keys": [("name", TEXT), ("description", TEXT), ("brand", TEXT), ("keywords", TEXT)],
+            # Ponderado para list_products: name > brand/keywords > description
+            "options": {
+                "default_language": "spanish",
+                "weights": {"name": 10, "brand": 5, "keywords": 5, "description": 1},
+            },
+        },
+        # _id al final: desempate del orden y del cursor de list_products
+        {
+            "name": "active_created",
+            "keys": [("is_active", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+        },
+        {
+            "name": "store_active_created",
+            "keys": [("store_id", ASCENDING), ("is_active", ASCENDING), ("created_at", DESCENDING),
+                     ("_id", DESCENDING)],
+        },
+        # Filtro por rango y orden por precio con descuento (list_products)
+        {
+            "name": "active_effective_price",
+            "keys": [("is_active", ASCENDING), ("effective_price", ASCENDING), ("_id", ASCENDING)],
+        },
+        {
+            "name": "store_active_effective_price",
+            "keys": [("store_id", ASCENDING), ("is_active", ASCENDING), ("effective_price", ASCENDING),
+                     ("_id", ASCENDING)],
+        },
+        # Productos con un descuento por empezar o terminar (refresh_effective_prices)
+        {
+            "name": "price_refresh_at",
+            "keys": [("price_refresh_at", ASCENDING)],
+            "options": {"partialFilterExpression": {"price_refresh_at": {"$type": "date"}}},
+        },
+        # Autocompletado (apps/stores/suggest.py): prefijos normalizados del nombre
+        {"name": "suggest_active", "keys": [("suggest", ASCENDING), ("is_active", ASCENDING)]},
+        # Único: create_product inserta y reintenta con otro slug si choca.
+        # Parcial para no chocar entre productos antiguos sin slug.
+        {
+            "name": "slug",
+            "keys": [("slug", ASCENDING)],
+            "options": {"unique": True, "partialFilterExpression": {"slug": {"$type": "string"}}},
+        },
+    ],
+    "post": [
+        {"name": "store_created", "keys": [("store_id", ASCENDING), ("created_at", DESCENDING)]},
+        {"name": "created", "keys": [("created_at", DESCENDING)]},
+        # Ramas del $or de recommend_similar_posts
+        {"name": "store_category_created",
+         "keys": [("store.category", ASCENDING), ("created_at", DESCENDING)]},
+        {"name": "store_country_created",
+         "keys": [("store.country", ASCENDING), ("created_at", DESCENDING)]},
+        {"name": "store_city_created", "keys": [("store.city", ASCENDING), ("created_at", DESCENDING)]},
+        {"name": "store_neighborhood_created",
+         "keys": [("store.neighborhood", ASCENDING), ("created_at", DESCENDING)]},
+    ],
+    "post_likes": [
+        {"name": "post_user_unique", "keys": [("post_id", ASCENDING), ("user_id", ASCENDING)],
+         "options": {"unique": True}},
+        {"name": "user_created", "keys": [("user_id", ASCENDING), ("created_at", DESCENDING)]},
+    ],
+    "comments": [
+        # _id desempata el orden y el cursor de get_post_comments
+        {"name": "post_created",
+         "keys": [("post_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]},
+    ],
+    "tips": [
+        {"name": "categoria_slug", "keys": [("categoria_slug", ASCENDING)]},
+    ],
+}
+
+
+def spec_signature(spec):
+    if any(direction == TEXT for _, direction in spec["keys"]):
+        return TEXT_KEY  # MongoDB permite un solo índice de texto por colección
+    return tuple((field, direction) for field, direction in spec["keys"])
+
+
+def spec_options(spec):
+    options = dict(spec.get("options", {}))
+    options.setdefault("unique", False)
+    if spec_signature(spec) == TEXT_KEY:
+        options.setdefault("weights", {field: 1 for field, _ in spec["keys"]})
+        options.setdefault("default_language", "english")
+    return options
+
+
+def existing_signature(info):
+    keys = info["key"]
+    if any(field == "_fts" for field, _ in keys):
+        return TEXT_KEY
+    return tuple((field, int(direction) if isinstance(direction, (int, float)) else direction)
+                 for field, direction in keys)
+
+
+def options_match(spec, info):
+    # Solo se comparan las opciones declaradas (más unique y, en texto, pesos e idioma)
+    for option, expected in spec_options(spec).items():
+        actual = info.get(option, False if option == "unique" else None)
+        if option == "weights" and actual:
+            actual = {field: int(weight) for field, weight in actual.items()}
+        if actual != expected:
+            return False
+    return True
+
+
+def diff_collection(collection_name, db=None):
+    """
+    Compara los índices declarados con los existentes en una colección.
+    Retorna {"missing": [...], "conflicting": [...], "extra": [...], "ok": [...]}
+    con nombres de índice.
+    """
+    db = db if db is not None else get_db()
+    existing = db[collection_name].index_information()
+    existing.pop("_id_", None)
+    by_signature = {existing_signature(info): name for name, info in existing.items()}
+
+    report = {"missing": [], "conflicting": [], "extra": [], "ok": []}
+    matched = set()
+    for spec in INDEXES.get(collection_name, []):
+        current = by_signature.get(spec_signature(spec))
+        if current is None and spec["name"] in existing:
+            # Mismo nombre con otras claves: se recrea con --drop-conflicting
+            matched.add(spec["name"])
+            report["conflicting"].append(spec["name"])
+            continue
+        if current is None:
+            report["missing"].append(spec["name"])
+            continue
+        matched.add(current)
+        if options_match(spec, existing[current]):
+            report["ok"].append(current)
+        else:
+            report["conflicting"].append(current)
+
+    report["extra"] = sorted(name for name in existing if name not in matched)
+    return report
+
+
+def diff_indexes(db=None):
+    db = db if db is not None else get_db()
+    return {name: diff_collection(name, db) for name in INDEXES}
+
+
+def ensure_collection_indexes(collection_name, db=None, drop_conflicting=False, drop_extra=False):
+    """
+    Crea (en background) los índices que faltan en una colección. Es idempotente.
+    Retorna el reporte de diferencias previo a los cambios.
+    """
+    db = db if db is not None else get_db()
+    collection = db[collection_name]
+    report = diff_collection(collection_name, db)
+
+    if drop_conflicting:
+        for name in report["conflicting"]:
+            collection.drop_index(name)
+    if drop_extra:
+        for name in report["extra"]:
+            collection.drop_index(name)
+
+    to_create = set(report["missing"])
+    if drop_conflicting:
+        # Se recrean con la definición declarada
+        present = {existing_signature(info) for info in collection.index_information().values()}
+        to_create |= {spec["name"] for spec in INDEXES[collection_name]
+                      if spec_signature(spec) not in present}
+
+    for spec in INDEXES[collection_name]:
+        if spec["name"] in to_create:
+            collection.create_index(spec["keys"], name=spec["name"], background=True,
+                                    **spec.get("options", {}))
+    return report
+
+
+def indexes_ready(db=None):
+    """
+    True si no falta ningún índice declarado. Usado por el endpoint de readiness.
+    """
+    try:
+        report = diff_indexes(db)
+    except PyMongoError:
+        return False, {}
+    missing = {name: r["missing"] for name, r in report.items() if r["missing"]}
+    return not missing, missing
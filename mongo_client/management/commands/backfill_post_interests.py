@@ -0,0 +1,77 @@
+from django.core.management.base import BaseCommand
+from pymongo import ReplaceOne, UpdateMany
+
+from apps.stores.models import Store
+from mongo_client.connection import mongo_db
+from mongo_client.models.post.interests import (INTEREST_PROJECTION, build_interest_document,
+                                                user_interests_collection)
+
+posts_collection = mongo_db["post"]
+post_likes_collection = mongo_db["post_likes"]
+
+
+class Command(BaseCommand):
+    help = ("Agrega categoría y ubicación de la tienda a los posts existentes "
+            "y reconstruye los perfiles de intereses (user_interests) desde post_likes.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--skip-posts", action="store_true",
+                            help="No actualiza los datos embebidos de la tienda en los posts.")
+        parser.add_argument("--skip-profiles", action="store_true",
+                            help="No reconstruye user_interests.")
+
+    def handle(self, *args, **options):
+        if not options["skip_posts"]:
+            self.enrich_posts(options["batch_size"])
+        if not options["skip_profiles"]:
+            self.rebuild_profiles(options["batch_size"])
+
+    def enrich_posts(self, batch_size):
+        store_ids = posts_collection.distinct("store_id")
+        stores = Store.objects.filter(id__in=store_ids).values(
+            "id", "category_id", "country_id", "city_id", "neighborhood_id"
+        )
+        ops = []
+        updated = 0
+        for store in stores.iterator():
+            ops.append(UpdateMany({"store_id": store["id"]}, {"$set": {
+                "store.category": store["category_id"],
+                "store.country": store["country_id"],
+                "store.city": store["city_id"],
+                "store.neighborhood": store["neighborhood_id"],
+            }}))
+            if len(ops) >= batch_size:
+                updated += posts_collection.bulk_write(ops, ordered=False).modified_count
+                ops = []
+        if ops:
+            updated += posts_collection.bulk_write(ops, ordered=False).modified_count
+        self.stdout.write(f"{updated} posts actualizados con categoría y ubicación de la tienda.")
+
+    def rebuild_profiles(self, batch_size):
+        # Un documento por usuario con los posts que le gustan (solo los campos del perfil).
+        # $lookup con localField + pipeline requiere MongoDB 5.0+.
+        pipeline = [
+            {"$group": {"_id": "$user_id", "post_ids": {"$push": "$post_id"}}},
+            {"$lookup": {
+                "from": posts_collection.name,
+                "localField": "post_ids",
+                "foreignField": "_id",
+                "pipeline": [{"$project": INTEREST_PROJECTION}],
+                "as": "posts",
+            }},
+            {"$project": {"posts": 1}},
+        ]
+        ops = []
+        rebuilt = 0
+        for row in post_likes_collection.aggregate(pipeline, allowDiskUse=True):
+            doc = build_interest_document(row["_id"], row["posts"])
+            ops.append(ReplaceOne({"_id": row["_id"]}, doc, upsert=True))
+            if len(ops) >= batch_size:
+                user_interests_collection.bulk_write(ops, ordered=False)
+                rebuilt += len(ops)
+                ops = []
+        if ops:
+            user_interests_collection.bulk_write(ops, ordered=False)
+            rebuilt += len(ops)
+        self.stdout.write(self.style.SUCCESS(f"{rebuilt} perfiles de intereses reconstruidos."))
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from pymongo import UpdateOne
+
+from mongo_client.models.product.products import products_collection
+from mongo_client.utils.text import suggest_keys
+
+
+class Command(BaseCommand):
+    help = (
+        "Calcula el campo suggest (autocompletado) de los productos. "
+        "Las tiendas se completan en la migración stores 0039."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--all", action="store_true",
+                            help="Recalcula también los productos que ya tienen suggest.")
+
+    def handle(self, *args, **options):
+        query = {} if options["all"] else {"suggest": {"$exists": False}}
+        batch_size = options["batch_size"]
+
+        operations = []
+        totals = {"products": 0, "modified": 0}
+        products = products_collection.find(query, {"name": 1}).sort("_id", 1).batch_size(batch_size)
+        for product in products:
+            operations.append(UpdateOne({"_id": product["_id"]},
+                                        {"$set": {"suggest": suggest_keys(product.get("name"))}}))
+            if len(operations) >= batch_size:
+                self.flush(operations, totals)
+                operations = []
+        if operations:
+            self.flush(operations, totals)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{totals['products']} productos revisados, {totals['modified']} actualizados."
+        ))
+
+    def flush(self, operations, totals):
+        totals["products"] += len(operations)
+        totals["modified"] += products_collection.bulk_write(operations, ordered=False).modified_count
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from mongo_client.indexes import INDEXES, diff_collection, ensure_collection_indexes
+
+
+class Command(BaseCommand):
+    help = "Crea los índices declarados en mongo_client/indexes.py y reporta diferencias."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--check", action="store_true",
+                            help="No crea nada; termina con error si falta algún índice.")
+        parser.add_argument("--drop-conflicting", action="store_true",
+                            help="Elimina y recrea índices con la misma clave pero otras opciones.")
+        parser.add_argument("--drop-extra", action="store_true",
+                            help="Elimina índices que no están declarados.")
+        parser.add_argument("--collection", choices=sorted(INDEXES), help="Solo esta colección.")
+
+    def handle(self, *args, **options):
+        collections = [options["collection"]] if options["collection"] else list(INDEXES)
+        missing_total = 0
+
+        for name in collections:
+            if options["check"]:
+                report = diff_collection(name)
+            else:
+                report = ensure_collection_indexes(
+                    name,
+                    drop_conflicting=options["drop_conflicting"],
+                    drop_extra=options["drop_extra"],
+                )
+            missing_total += len(report["missing"])
+            self.print_report(name, report, options)
+
+        if options["check"] and missing_total:
+            raise CommandError(f"Faltan {missing_total} índices en MongoDB.")
+
+    def print_report(self, name, report, options):
+        self.stdout.write(self.style.MIGRATE_HEADING(name))
+        for index in report["ok"]:
+            self.stdout.write(f"  ok          {index}")
+        for index in report["missing"]:
+            action = "falta" if options["check"] else "creado"
+            self.stdout.write(self.style.WARNING(f"  {action:<11} {index}"))
+        for index in report["conflicting"]:
+            action = "recreado" if options["drop_conflicting"] else "distinto"
+            self.stdout.write(self.style.WARNING(f"  {action:<11} {index}"))
+        for index in report["extra"]:
+            action = "eliminado" if options["drop_extra"] else "extra"
+            self.stdout.write(f"  {action:<11} {index}")
@@ -0,0 +1,31 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.stores.models import Store
+from mongo_client.models.product.exporter import export_products
+
+
+class Command(BaseCommand):
+    help = "Exporta el catálogo de una tienda en NDJSON o CSV (streaming)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--store", type=int, required=True, help="id de la tienda.")
+        parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+        parser.add_argument("--gzip", action="store_true")
+        parser.add_argument("--output", help="Archivo de salida (por defecto stdout).")
+
+    def handle(self, *args, **options):
+        if not Store.objects.filter(id=options["store"]).exists():
+            raise CommandError("Tienda no encontrada.")
+
+        chunks = export_products(options["store"], fmt=options["format"], gzip=options["gzip"])
+        out = open(options["output"], "wb") if options["output"] else sys.stdout.buffer
+        try:
+            for chunk in chunks:
+                out.write(chunk if isinstance(chunk, bytes) else chunk.encode("utf-8"))
+        finally:
+            if options["output"]:
+                out.close()
+            else:
+                out.flush()
@@ -0,0 +1,40 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.stores.models import Store
+from mongo_client.models.product.importer import IMPORT_BATCH_SIZE, detect_format, import_products
+
+
+class Command(BaseCommand):
+    help = "Importa productos desde un archivo CSV o NDJSON a una tienda."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--store", type=int, required=True, help="id de la tienda.")
+        parser.add_argument("--format", choices=["csv", "ndjson"],
+                            help="Por defecto se deduce de la extensión.")
+        parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+        parser.add_argument("--dry-run", action="store_true", help="Solo valida, no inserta.")
+        parser.add_argument("--errors", help="Archivo donde guardar el reporte de errores (JSON).")
+
+    def handle(self, *args, **options):
+        try:
+            store = Store.objects.get(id=options["store"])
+        except Store.DoesNotExist:
+            raise CommandError("Tienda no encontrada.")
+
+        fmt = options["format"] or detect_format(options["path"])
+        with open(options["path"], "rb") as fileobj:
+            report = import_products(fileobj, store, fmt=fmt, batch_size=options["batch_size"],
+                                     dry_run=options["dry_run"])
+
+        self.stdout.write(
+            f"{report['total']} filas: {report['inserted']} insertadas, {report['failed']} con error."
+        )
+        if options["errors"] and report["errors"]:
+            with open(options["errors"], "w") as out:
+                json.dump(report["errors"], out, ensure_ascii=False, indent=2, default=str)
+        else:
+            for error in report["errors"][:20]:
+                self.stdout.write(self.style.WARNING(f"  fila {error['row']}: {error['errors']}"))
@@ -0,0 +1,77 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+from pymongo import UpdateOne
+
+from mongo_client.connection import mongo_db
+from mongo_client.indexes import ensure_collection_indexes
+
+posts_collection = mongo_db["post"]
+post_likes_collection = mongo_db["post_likes"]
+
+
+class Command(BaseCommand):
+    help = ("Copia los likes embebidos (post.liked_by) a la colección post_likes "
+            "y recalcula el contador likes de cada post. Es idempotente.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--unset", action="store_true",
+                            help="Elimina liked_by de los posts ya migrados.")
+
+    def handle(self, *args, **options):
+        # El índice único hace idempotentes los upserts
+        ensure_collection_indexes("post_likes")
+
+        batch_size = options["batch_size"]
+        query = {"liked_by.0": {"$exists": True}}
+        migrated_posts = 0
+        migrated_likes = 0
+
+        ops = []
+        post_ids = []
+        cursor = posts_collection.find(query, {"liked_by": 1, "created_at": 1}).batch_size(batch_size)
+        for post in cursor:
+            # Sin fecha real del like se usa la del post
+            liked_at = post.get("created_at") or datetime.utcnow()
+            for user_id in set(post["liked_by"]):
+                ops.append(UpdateOne(
+                    {"post_id": post["_id"], "user_id": user_id},
+                    {"$setOnInsert": {"created_at": liked_at}},
+                    upsert=True,
+                ))
+            post_ids.append(post["_id"])
+            migrated_likes += len(set(post["liked_by"]))
+
+            if len(post_ids) >= batch_size:
+                self.flush(ops, post_ids, options["unset"])
+                migrated_posts += len(post_ids)
+                ops, post_ids = [], []
+
+        if post_ids:
+            self.flush(ops, post_ids, options["unset"])
+            migrated_posts += len(post_ids)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{migrated_posts} posts y {migrated_likes} likes migrados a post_likes."
+        ))
+
+    def flush(self, ops, post_ids, unset):
+        if ops:
+            post_likes_collection.bulk_write(ops, ordered=False)
+
+        # El contador sale de post_likes (incluye likes hechos después del despliegue)
+        counts = {
+            row["_id"]: row["count"]
+            for row in post_likes_collection.aggregate([
+                {"$match": {"post_id": {"$in": post_ids}}},
+                {"$group": {"_id": "$post_id", "count": {"$sum": 1}}},
+            ])
+        }
+        updates = []
+        for post_id in post_ids:
+            update = {"$set": {"likes": counts.get(post_id, 0)}}
+            if unset:
+                update["$unset"] = {"liked_by": ""}
+            updates.append(UpdateOne({"_id": post_id}, update))
+        posts_collection.bulk_write(updates, ordered=False)
@@ -0,0 +1,265 @@
+import random
+import statistics
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pymongo
+from bson import ObjectId
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.mongo_utils import get_product_by_id
+from mongo_client.connection import get_client, mongo_db
+from mongo_client.indexes import INDEXES
+from mongo_client.models.product.products import TEXT_SEARCH_FIELDS, regex_filter, text_rank_stage
+from mongo_client.models.post.likes import post_likes_collection, toggle_like
+from mongo_client.views.post.scoring import candidate_features, diversify, score_candidates
+
+products_collection = mongo_db["products"]
+
+# Colección aparte para los escenarios que necesitan datos sembrados
+BENCH_PRODUCTS = "bench_products"
+
+WORDS = [
+    "zapato", "camisa", "pantalón", "chaqueta", "bolso", "reloj", "gafas", "gorra",
+    "celular", "audífonos", "cargador", "portátil", "teclado", "mouse", "monitor",
+    "arroz", "café", "chocolate", "queso", "pan", "empanada", "hamburguesa", "pizza",
+    "silla", "mesa", "lámpara", "cojín", "cortina", "tapete", "espejo", "maceta",
+    "rojo", "azul", "negro", "blanco", "cuero", "algodón", "deportivo", "clásico",
+]
+BRANDS = ["Acme", "Nova", "Andina", "Caribe", "Sierra", "Delta", "Orion", "Pacífico"]
+
+
+def summarize(samples_ms):
+    ordered = sorted(samples_ms)
+    p95_index = max(0, int(round(len(ordered) * 0.95)) - 1)
+    return {
+        "mean": statistics.mean(ordered),
+        "p50": statistics.median(ordered),
+        "p95": ordered[p95_index],
+        "max": ordered[-1],
+    }
+
+
+class Command(BaseCommand):
+    help = "Micro-benchmarks de acceso a MongoDB (latencia por operación)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scenario", choices=["lookup", "search", "recommend", "likes"], default="lookup")
+        parser.add_argument("--iterations", type=int, default=200)
+        parser.add_argument("--seed", type=int, default=0,
+                            help="Productos sintéticos a sembrar en bench_products antes de medir.")
+        parser.add_argument("--candidates", type=int, default=5000,
+                            help="Candidatos por request en el escenario recommend.")
+        parser.add_argument("--threads", type=int, default=16,
+                            help="Hilos concurrentes en el escenario likes.")
+
+    def handle(self, *args, **options):
+        scenario = options["scenario"]
+        handler = getattr(self, f"bench_{scenario}")
+        handler(options)
+
+    def report(self, label, samples_ms):
+        stats = summarize(samples_ms)
+        self.stdout.write(
+            f"{label:<28} n={len(samples_ms):<6} "
+            f"mean={stats['mean']:.2f}ms p50={stats['p50']:.2f}ms "
+            f"p95={stats['p95']:.2f}ms max={stats['max']:.2f}ms"
+        )
+
+    def bench_lookup(self, options):
+        """
+        Compara un find_one por _id creando un MongoClient por llamada
+        (comportamiento anterior de get_product_by_id) contra el cliente
+        compartido del proceso.
+        """
+        iterations = options["iterations"]
+        ids = [
+            str(doc["_id"])
+            for doc in products_collection.find({}, {"_id": 1}).limit(iterations)
+        ]
+        if not ids:
+            raise CommandError("La colección products está vacía.")
+
+        # Antes: cliente nuevo (pool + selección de servidor) en cada consulta
+        before = []
+        for i in range(iterations):
+            product_id = ids[i % len(ids)]
+            start = time.perf_counter()
+            client = pymongo.MongoClient(settings.MONGO_URI, serverSelectionTimeoutMS=5000)
+            client[settings.MONGO_DB_NAME].products.find_one({"_id": ObjectId(product_id)})
+            client.close()
+            before.append((time.perf_counter() - start) * 1000)
+
+        # Después: cliente compartido (calentado antes de medir)
+        get_client().admin.command("ping")
+        after = []
+        for i in range(iterations):
+            product_id = ids[i % len(ids)]
+            start = time.perf_counter()
+            get_product_by_id(product_id)
+            after.append((time.perf_counter() - start) * 1000)
+
+        self.report("MongoClient por consulta", before)
+        self.report("cliente compartido", after)
+
+
+    def seed_products(self, count, batch_size=10000):
+        collection = mongo_db[BENCH_PRODUCTS]
+        collection.drop()
+        rng = random.Random(42)
+        now = datetime.utcnow()
+
+        for offset in range(0, count, batch_size):
+            batch = []
+            for _ in range(min(batch_size, count - offset)):
+                words = rng.sample(WORDS, 3)
+                batch.append({
+                    "name": " ".join(words[:2]).capitalize(),
+                    "description": " ".join(rng.sample(WORDS, 8)),
+                    "brand": rng.choice(BRANDS),
+                    "keywords": words,
+                    "price": round(rng.uniform(1000, 500000), 2),
+                    "store_id": rng.randint(1, 2000),
+                    "is_active": True,
+                    "created_at": now - timedelta(minutes=rng.randint(0, 60 * 24 * 365)),
+                })
+            collection.insert_many(batch, ordered=False)
+        for spec in INDEXES["products"]:
+            collection.create_index(spec["keys"], name=spec["name"], **spec.get("options", {}))
+        self.stdout.write(f"Sembrados {count} productos en {BENCH_PRODUCTS}")
+
+    def bench_search(self, options):
+        """
+        Búsqueda de catálogo: regex sin anclar sobre 4 campos (antes) contra
+        $text ponderado + recencia (después), primera página de 10.
+        """
+        if options["seed"]:
+            self.seed_products(options["seed"])
+        collection = mongo_db[BENCH_PRODUCTS]
+        if not collection.estimated_document_count():
+            raise CommandError("bench_products está vacía; usa --seed N.")
+
+        rng = random.Random(7)
+        terms = [rng.choice(WORDS) for _ in range(options["iterations"])]
+
+        before = []
+        for term in terms:
+            rgx = regex_filter(term)
+            pipe = [
+                {"$match": {"is_active": True, "$or": [{f: rgx} for f in TEXT_SEARCH_FIELDS]}},
+                {"$sort": {"created_at": -1}},
+                {"$limit": 10},
+            ]
+            start = time.perf_counter()
+            list(collection.aggregate(pipe))
+            before.append((time.perf_counter() - start) * 1000)
+
+        after = []
+        for term in terms:
+            pipe = [
+                {"$match": {"is_active": True, "$text": {"$search": term}}},
+                text_rank_stage(),
+                {"$sort": {"_rank": -1, "_id": -1}},
+                {"$limit": 10},
+            ]
+            start = time.perf_counter()
+            list(collection.aggregate(pipe))
+            after.append((time.perf_counter() - start) * 1000)
+
+        self.report("regex $or", before)
+        self.report("$text ponderado", after)
+
+    def bench_recommend(self, options):
+        """
+        Ranking de recomendaciones (features + puntaje + diversidad) sobre
+        candidatos sintéticos en memoria; no consulta MongoDB.
+        """
+        rng = random.Random(3)
+        now = datetime.utcnow()
+        n = options["candidates"]
+        candidates = [
+            {
+                "_id": ObjectId(),
+                "store_id": rng.randint(1, 300),
+                "store": {
+                    "category": rng.randint(1, 20),
+                    "country": rng.randint(1, 3),
+                    "city": rng.randint(1, 30),
+                    "neighborhood": rng.randint(1, 200),
+                },
+                "likes": rng.randint(0, 5000),
+                "created_at": now - timedelta(minutes=rng.randint(0, 60 * 24 * 90)),
+            }
+            for _ in range(n)
+        ]
+        interests = {
+            "stores": {str(rng.randint(1, 300)): rng.randint(1, 20) for _ in range(30)},
+            "categories": {str(rng.randint(1, 20)): rng.randint(1, 20) for _ in range(5)},
+            "countries": {"1": 10},
+            "cities": {str(rng.randint(1, 30)): rng.randint(1, 10) for _ in range(3)},
+            "neighborhoods": {str(rng.randint(1, 200)): rng.randint(1, 5) for _ in range(5)},
+        }
+
+        features_ms, ranking_ms, total_ms = [], [], []
+        for i in range(options["iterations"]):
+            start = time.perf_counter()
+            features = candidate_features(candidates, interests, now)
+            middle = time.perf_counter()
+            scores = score_candidates(features, seed=i)
+            diversify(scores, [c["store_id"] for c in candidates])
+            end = time.perf_counter()
+            features_ms.append((middle - start) * 1000)
+            ranking_ms.append((end - middle) * 1000)
+            total_ms.append((end - start) * 1000)
+
+        self.report(f"features ({n})", features_ms)
+        self.report(f"puntaje + diversidad ({n})", ranking_ms)
+        self.report(f"total ({n})", total_ms)
+
+    def bench_likes(self, options):
+        """
+        Martilla un post temporal con toggle_like desde varios hilos (varios
+        usuarios, toques repetidos) y verifica que el contador likes coincida
+        con los documentos de post_likes.
+        """
+        posts_collection = mongo_db["post"]
+        post_id = posts_collection.insert_one({
+            "title": "benchmark likes", "likes": 0, "created_at": datetime.utcnow(),
+        }).inserted_id
+
+        threads_count = options["threads"]
+        iterations = options["iterations"]
+        samples = []
+        lock = threading.Lock()
+
+        def hammer(thread_index):
+            rng = random.Random(thread_index)
+            local = []
+            for _ in range(iterations):
+                # Pocos usuarios para forzar toques concurrentes del mismo usuario
+                user_id = -rng.randint(1, 10)
+                start = time.perf_counter()
+                toggle_like(post_id, user_id)
+                local.append((time.perf_counter() - start) * 1000)
+            with lock:
+                samples.extend(local)
+
+        threads = [threading.Thread(target=hammer, args=(i,)) for i in range(threads_count)]
+        try:
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+            likes = posts_collection.find_one({"_id": post_id}, {"likes": 1})["likes"]
+            stored = post_likes_collection.count_documents({"post_id": post_id})
+        finally:
+            posts_collection.delete_one({"_id": post_id})
+            post_likes_collection.delete_many({"post_id": post_id})
+
+        self.report(f"toggle_like ({threads_count} hilos)", samples)
+        if likes != stored:
+            raise CommandError(f"Contador desviado: likes={likes}, post_likes={stored}")
+        self.stdout.write(self.style.SUCCESS(f"Contador consistente: likes={likes}, post_likes={stored}"))
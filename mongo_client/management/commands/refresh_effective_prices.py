@@ -0,0 +1,42 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+from pymongo import UpdateOne
+
+from mongo_client.models.product.products import PRICE_SOURCE_FIELDS, price_fields, products_collection
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula effective_price, min_price y max_price de los productos cuyo descuento "
+        "empezó o terminó. Programar a diario (p. ej. cron a las 00:05)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--all", action="store_true",
+                            help="Recalcula todos los productos (backfill inicial).")
+
+    def handle(self, *args, **options):
+        query = {} if options["all"] else {"price_refresh_at": {"$lte": datetime.now()}}
+        projection = {field: 1 for field in PRICE_SOURCE_FIELDS}
+        batch_size = options["batch_size"]
+
+        operations = []
+        totals = {"products": 0, "modified": 0}
+        products = products_collection.find(query, projection).sort("_id", 1).batch_size(batch_size)
+        for product in products:
+            operations.append(UpdateOne({"_id": product["_id"]}, {"$set": price_fields(product)}))
+            if len(operations) >= batch_size:
+                self.flush(operations, totals)
+                operations = []
+        if operations:
+            self.flush(operations, totals)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{totals['products']} productos revisados, {totals['modified']} actualizados."
+        ))
+
+    def flush(self, operations, totals):
+        totals["products"] += len(operations)
+        totals["modified"] += products_collection.bulk_write(operations, ordered=False).modified_count
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from apps.stores.models import Store
+from mongo_client.store_sync import posts_collection, products_collection, store_sync_operations
+
+
+class Command(BaseCommand):
+    help = "Reescribe los datos de tienda embebidos en products y post para todas las tiendas."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=200)
+        parser.add_argument("--store", type=int, help="Solo esta tienda (id).")
+
+    def handle(self, *args, **options):
+        stores = Store.objects.order_by("id")
+        if options["store"]:
+            stores = stores.filter(id=options["store"])
+
+        batch_size = options["batch_size"]
+        product_ops, post_ops = [], []
+        totals = {"stores": 0, "products": 0, "posts": 0}
+
+        for store in stores.iterator(chunk_size=batch_size):
+            product_op, post_op = store_sync_operations(store)
+            product_ops.append(product_op)
+            post_ops.append(post_op)
+            if len(product_ops) >= batch_size:
+                self.flush(product_ops, post_ops, totals)
+                product_ops, post_ops = [], []
+        if product_ops:
+            self.flush(product_ops, post_ops, totals)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{totals['stores']} tiendas: {totals['products']} productos y "
+            f"{totals['posts']} posts actualizados."
+        ))
+
+    def flush(self, product_ops, post_ops, totals):
+        totals["stores"] += len(product_ops)
+        totals["products"] += products_collection.bulk_write(product_ops, ordered=False).modified_count
+        totals["posts"] += posts_collection.bulk_write(post_ops, ordered=False).modified_count
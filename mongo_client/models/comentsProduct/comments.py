@@ -1,9 +1,7 @@
 from datetime import datetime
 from bson import ObjectId
 from ...connection import mongo_db
-from apps.users.models import User
-from datetime import datetime
-from ...connection import mongo_db
+from ...utils.cursors import encode_cursor, decode_cursor, created_before
 
 from django.contrib.auth import get_user_model
 
@@ -12,7 +10,10 @@ User = get_user_model()
 comments_collection = mongo_db["comments"]
 posts_collection = mongo_db["post"]
 
-def increment_post_comments_count(post_id):
+def increment_post_comments_count(post_id, amount=1):
+    """
+    Suma amount a comments_count. Retorna False si el post no existe.
+    """
     try:
         oid = ObjectId(post_id)
     except Exception:
@@ -20,51 +21,80 @@ def increment_post_comments_count(post_id):
 
     result = posts_collection.update_one(
         {"_id": oid},
-        {"$inc": {"comments_count": 1}}
+        {"$inc": {"comments_count": amount}}
     )
-    print(f"Incrementar comentarios para post_id={post_id}: matched={result.matched_count}, modified={result.modified_count}")
-
-def create_comment(data):
+    return result.matched_count > 0
+
+def create_comment(data, user=None):
+    """
+    Crea el comentario. El nombre e iniciales se toman de user (el usuario
+    autenticado del request) para no consultar Postgres por cada comentario.
+    Retorna (comentario, user) o (None, user) si el post no existe.
+    """
     now = datetime.utcnow()
 
-    try:
-        user = User.objects.get(id=data["user_id"])
-        username = user.username
-    except User.DoesNotExist:
-        username = f"User{data['user_id']}"
-        user = None  # en caso de necesitarlo luego
+    if user is None:
+        user = User.objects.filter(id=data["user_id"]).first()
+    username = user.username if user else f"User{data['user_id']}"
 
+    post_id = ObjectId(data["post_id"])
     comment = {
-        "post_id": ObjectId(data["post_id"]),
+        "post_id": post_id,
         "user_id": data["user_id"],
         "content": data["content"],
         "created_at": now,
         "updated_at": now,
         "user_name": username,
+        "user_initials": user.initials if user else username[:2].upper(),
     }
 
-    inserted = comments_collection.insert_one(comment)
-    increment_post_comments_count(str(data["post_id"]))
+    # comments y post son colecciones distintas (no hay bulk_write entre
+    # colecciones): primero el contador, que además valida que el post exista,
+    # y si el insert falla se compensa.
+    if not increment_post_comments_count(post_id):
+        return None, user
+    try:
+        inserted = comments_collection.insert_one(comment)
+    except Exception:
+        increment_post_comments_count(post_id, -1)
+        raise
 
     comment["_id"] = inserted.inserted_id  # Añadir el ID al comentario original
     return comment, user
 
 
-def get_post_comments(post_id, page=1, page_size=10):
-    skip = (page - 1) * page_size
-
-    total = comments_collection.count_documents({"post_id": ObjectId(post_id)})
-
-    comments_cursor = comments_collection.find(
-        {"post_id": ObjectId(post_id)}
-    ).sort("created_at", -1).skip(skip).limit(page_size)
+def get_post_comments(post_id, page=1, page_size=10, cursor=None):
+    """
+    Comentarios del post, del más reciente al más antiguo.
+    Con cursor (next_cursor de la página anterior) se pagina por rango sobre
+    (created_at, _id) en vez de skip. El total sale de comments_count del post.
+    Retorna (comments, total, next_cursor).
+    """
+    post_oid = ObjectId(post_id)
+    query = {"post_id": post_oid}
+    if cursor:
+        query["$or"] = created_before(decode_cursor(cursor, "created"))
+        skip = 0
+    else:
+        skip = (page - 1) * page_size
+
+    post = posts_collection.find_one({"_id": post_oid}, {"comments_count": 1}) or {}
+    total = post.get("comments_count", 0)
+
+    comments_cursor = comments_collection.find(query).sort(
+        [("created_at", -1), ("_id", -1)]
+    ).skip(skip).limit(page_size + 1)
 
     comments = list(comments_cursor)
+    next_cursor = None
+    if len(comments) > page_size:
+        comments = comments[:page_size]
+        last = comments[-1]
+        next_cursor = encode_cursor("created", last["created_at"], last["_id"])
 
     for comment in comments:
         comment["_id"] = str(comment["_id"])
         comment["post_id"] = str(comment["post_id"])
         comment["user_id"] = str(comment["user_id"])
 
-    return comments, total
-
+    return comments, total, next_cursor
@@ -14,6 +14,10 @@ class CommentSerializer(serializers.Serializer):
         return obj.get("user_name", f"User{obj.get('user_id')}")
     
     def get_initials(self, obj):
+        # Guardadas al crear el comentario (los antiguos no las tienen)
+        if obj.get("user_initials"):
+            return obj["user_initials"]
+
         name = obj.get("user_name", "") or ""
         parts = name.strip().split()
         initials = ""
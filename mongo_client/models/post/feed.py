@@ -0,0 +1,63 @@
+import random
+from django.core.cache import cache
+from ...connection import mongo_db
+
+
+# Feed público materializado.
+# En vez de leer y mezclar los últimos posts en cada request, se guarda en
+# cache una lista compacta de ids ya mezclada por cada semilla. Con la misma
+# semilla el cliente recibe siempre el mismo orden, así que la paginación es
+# estable. La lista se regenera al vencer el TTL o al crear/borrar un post.
+posts_collection = mongo_db["post"]
+
+PUBLIC_FEED_SIZE = 100      # posts recientes que entran al feed
+PUBLIC_FEED_SEEDS = 20      # semillas distintas (acota las entradas en cache)
+PUBLIC_FEED_TTL = 300       # segundos
+
+VERSION_KEY = "public_feed:version"
+
+
+def feed_version():
+    return cache.get_or_set(VERSION_KEY, 1, None)
+
+
+def invalidate_public_feed():
+    """
+    Invalida todas las listas del feed (se llama al crear o borrar un post).
+    """
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, None)
+
+
+def normalize_seed(seed):
+    try:
+        return int(seed) % PUBLIC_FEED_SEEDS
+    except (TypeError, ValueError):
+        return random.randrange(PUBLIC_FEED_SEEDS)
+
+
+def public_feed_ids(seed):
+    """
+    Ids (str) del feed público mezclados con la semilla dada.
+    """
+    version = feed_version()
+    key = f"public_feed:{version}:{seed}"
+    ids = cache.get(key)
+    if ids is not None:
+        return ids
+
+    latest_key = f"public_feed:{version}:latest"
+    latest = cache.get(latest_key)
+    if latest is None:
+        latest = [
+            str(p["_id"])
+            for p in posts_collection.find({}, {"_id": 1}).sort("created_at", -1).limit(PUBLIC_FEED_SIZE)
+        ]
+        cache.set(latest_key, latest, PUBLIC_FEED_TTL)
+
+    ids = list(latest)
+    random.Random(seed).shuffle(ids)
+    cache.set(key, ids, PUBLIC_FEED_TTL)
+    return ids
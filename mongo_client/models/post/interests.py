@@ -0,0 +1,82 @@
+from collections import Counter
+from datetime import datetime
+from ...connection import mongo_db
+
+
+# Perfil de intereses por usuario, mantenido de forma incremental:
+# cada like suma 1 (y cada unlike resta 1) a la tienda, categoría y ubicación
+# del post. Reemplaza recontar todos los posts que le gustaron en cada
+# recomendación.
+#   {_id: user_id, stores: {"12": 3}, categories: {...}, countries: {...},
+#    cities: {...}, neighborhoods: {...}, updated_at}
+user_interests_collection = mongo_db["user_interests"]
+
+# dimensión del perfil -> campo del post
+INTEREST_FIELDS = {
+    "stores": "store_id",
+    "categories": "store.category",
+    "countries": "store.country",
+    "cities": "store.city",
+    "neighborhoods": "store.neighborhood",
+}
+
+# Campos del post necesarios para actualizar el perfil
+INTEREST_PROJECTION = {"store_id": 1, "store": 1}
+
+
+def post_interest_values(post):
+    """
+    {dimensión: id} de un post (se omiten los valores vacíos).
+    """
+    store = post.get("store") or {}
+    values = {
+        "stores": post.get("store_id"),
+        "categories": store.get("category"),
+        "countries": store.get("country"),
+        "cities": store.get("city"),
+        "neighborhoods": store.get("neighborhood"),
+    }
+    return {dim: value for dim, value in values.items() if value is not None}
+
+
+def record_interest(user_id, post, amount=1):
+    """
+    Suma amount (1 en like, -1 en unlike) a los intereses del usuario.
+    """
+    values = post_interest_values(post or {})
+    if not values:
+        return
+    user_interests_collection.update_one(
+        {"_id": user_id},
+        {
+            "$inc": {f"{dim}.{value}": amount for dim, value in values.items()},
+            "$set": {"updated_at": datetime.utcnow()},
+        },
+        upsert=True,
+    )
+
+
+def build_interest_document(user_id, posts):
+    """
+    Perfil completo a partir de los posts que le gustan al usuario (backfill).
+    """
+    doc = {dim: Counter() for dim in INTEREST_FIELDS}
+    for post in posts:
+        for dim, value in post_interest_values(post).items():
+            doc[dim][str(value)] += 1
+    doc = {dim: dict(counter) for dim, counter in doc.items()}
+    doc["_id"] = user_id
+    doc["updated_at"] = datetime.utcnow()
+    return doc
+
+
+def get_user_interests(user_id):
+    return user_interests_collection.find_one({"_id": user_id})
+
+
+def top_interests(interests, dim, n=3):
+    """
+    Los n ids con más likes en una dimensión (como enteros, igual que en el post).
+    """
+    counts = Counter({key: count for key, count in (interests.get(dim) or {}).items() if count > 0})
+    return [int(key) for key, _ in counts.most_common(n)]
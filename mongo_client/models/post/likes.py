@@ -0,0 +1,111 @@
+from datetime import datetime
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from ...connection import mongo_db
+from .interests import INTEREST_PROJECTION, record_interest
+
+
+# Un documento por like: {post_id, user_id, created_at}.
+# Índices (mongo_client/indexes.py): único (post_id, user_id) y (user_id, created_at).
+# El post solo guarda el contador "likes"; así un post viral no crece
+# ni se vuelve más caro de leer.
+post_likes_collection = mongo_db["post_likes"]
+posts_collection = mongo_db["post"]
+
+
+def to_object_id(post_id):
+    return post_id if isinstance(post_id, ObjectId) else ObjectId(post_id)
+
+
+def bump_likes(post_id, amount):
+    """
+    Suma amount al contador y devuelve el post actualizado (likes y campos
+    del perfil de intereses) en el mismo round trip. None si no existe.
+    """
+    return posts_collection.find_one_and_update(
+        {"_id": post_id},
+        {"$inc": {"likes": amount}},
+        projection={"likes": 1, **INTEREST_PROJECTION},
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+def toggle_like(post_id, user_id):
+    """
+    Da o quita el like sin leer antes el post ni el like:
+    - delete_one del like; si existía, es un unlike.
+    - si no, insert_one; el índice único (post_id, user_id) resuelve los
+      toques concurrentes (DuplicateKeyError = otro request ya lo dio).
+    Cada like insertado/borrado va acompañado de exactamente un $inc, así el
+    contador no se desvía.
+
+    Retorna {"is_liked", "likes"} o None si el post no existe.
+    """
+    post_id = to_object_id(post_id)
+
+    if post_likes_collection.delete_one({"post_id": post_id, "user_id": user_id}).deleted_count:
+        post = bump_likes(post_id, -1)
+        record_interest(user_id, post, -1)
+        return {"is_liked": False, "likes": post.get("likes", 0)} if post else None
+
+    try:
+        post_likes_collection.insert_one({
+            "post_id": post_id,
+            "user_id": user_id,
+            "created_at": datetime.utcnow(),
+        })
+    except DuplicateKeyError:
+        post = posts_collection.find_one({"_id": post_id}, {"likes": 1})
+        return {"is_liked": True, "likes": post.get("likes", 0)} if post else None
+
+    post = bump_likes(post_id, 1)
+    if post is None:
+        # El post no existe: se deshace el like recién insertado
+        post_likes_collection.delete_one({"post_id": post_id, "user_id": user_id})
+        return None
+    record_interest(user_id, post, 1)
+    return {"is_liked": True, "likes": post.get("likes", 0)}
+
+
+def is_post_liked(post_id, user_id):
+    return post_likes_collection.count_documents(
+        {"post_id": to_object_id(post_id), "user_id": user_id}, limit=1
+    ) > 0
+
+
+def liked_post_ids(user_id, post_ids):
+    """
+    De los posts de una página, cuáles le gustan al usuario (una sola consulta).
+    Retorna un set de ids en str.
+    """
+    oids = [to_object_id(pid) for pid in post_ids if ObjectId.is_valid(str(pid))]
+    if not oids:
+        return set()
+    return {
+        str(like["post_id"])
+        for like in post_likes_collection.find(
+            {"user_id": user_id, "post_id": {"$in": oids}}, {"post_id": 1, "_id": 0}
+        )
+    }
+
+
+def user_liked_post_ids(user_id, skip=0, limit=0):
+    """
+    Ids de los posts que le gustan al usuario, del like más reciente al más antiguo.
+    """
+    cursor = (
+        post_likes_collection.find({"user_id": user_id}, {"post_id": 1, "_id": 0})
+        .sort("created_at", -1)
+        .skip(skip)
+        .limit(limit)
+    )
+    return [like["post_id"] for like in cursor]
+
+
+def count_user_likes(user_id):
+    return post_likes_collection.count_documents({"user_id": user_id})
+
+
+def delete_post_likes(post_id):
+    post_likes_collection.delete_many({"post_id": to_object_id(post_id)})
@@ -1,6 +1,8 @@
 from datetime import datetime
+import math
 from bson import ObjectId
 from ...connection import mongo_db
+from .feed import invalidate_public_feed
 
 
 posts_collection = mongo_db["post"]
@@ -15,6 +17,8 @@ def create_post(post_data):
     result = posts_collection.insert_one(post)
     post["_id"] = str(result.inserted_id)
 
+    invalidate_public_feed()
+
     return post
 
 def process_post_with_absolute_media(post, request):
@@ -47,6 +51,48 @@ def process_post_with_absolute_media(post, request):
     return post
 
 
+# Campos que necesitan los listados (PostSerializer + process_post_with_absolute_media).
+# Los likes viven en post_likes (ver likes.py); el post solo trae el contador.
+POST_LIST_PROJECTION = {
+    field: 1 for field in (
+        "store_id", "store", "store_logo", "title", "content", "media", "media_type",
+        "likes", "comments_count", "created_at", "updated_at",
+    )
+}
+
+
+def paginate_posts(query, page, page_size):
+    """
+    Página de posts ordenada por created_at desc, paginada en MongoDB
+    (skip/limit + count_documents sobre el índice del filtro).
+    Retorna (posts, total_posts, total_pages); total_pages es al menos 1.
+    """
+    total = posts_collection.count_documents(query)
+    total_pages = max(1, math.ceil(total / page_size))
+    if page < 1 or page > total_pages:
+        return None, total, total_pages
+
+    posts = list(
+        posts_collection.find(query, POST_LIST_PROJECTION)
+        .sort("created_at", -1)
+        .skip((page - 1) * page_size)
+        .limit(page_size)
+    )
+    return posts, total, total_pages
+
+
+def get_posts_by_ids(post_ids):
+    """
+    Carga varios posts con una sola consulta $in, en el orden de post_ids
+    (los que ya no existen se omiten).
+    """
+    posts = {
+        p["_id"]: p
+        for p in posts_collection.find({"_id": {"$in": list(post_ids)}}, POST_LIST_PROJECTION)
+    }
+    return [posts[pid] for pid in post_ids if pid in posts]
+
+
 def get_post_by_id(post_id):
     try:
         return posts_collection.find_one({"_id": ObjectId(post_id)})
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from bson import ObjectId
 from ....connection import mongo_db
+from ..likes import is_post_liked
 
 from apps.stores.models import Store
 
@@ -56,9 +57,12 @@ class PostSerializer(serializers.Serializer):
         if not request or not request.user.is_authenticated:
             return False
 
-        user_id = request.user.id
-        liked_by = instance.get('liked_by', [])
-        return user_id in liked_by
+        # Los listados pasan en el contexto los likes de la página ya resueltos
+        liked_post_ids = self.context.get('liked_post_ids')
+        if liked_post_ids is not None:
+            return str(instance.get('_id')) in liked_post_ids
+
+        return is_post_liked(instance.get('_id'), request.user.id)
 
     def create(self, validated_data):
         store_id = validated_data.pop('store_id')
@@ -68,12 +72,16 @@ class PostSerializer(serializers.Serializer):
         except Store.DoesNotExist:
             raise serializers.ValidationError("Tienda no encontrada")
 
-        # Embebe los datos necesarios
+        # Embebe los datos necesarios (categoría y ubicación: recomendaciones)
         validated_data['store'] = {
             '_id': store.id,
             'name': store.name,
             'logo': store.logo.url if store.logo else '',
-            'slug': store.slug
+            'slug': store.slug,
+            'category': store.category_id,
+            'country': store.country_id,
+            'city': store.city_id,
+            'neighborhood': store.neighborhood_id,
         }
 
         validated_data['store_id'] = store_id 
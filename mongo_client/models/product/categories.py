@@ -0,0 +1,40 @@
+from django.core.cache import cache
+
+from apps.stores.models import CategoryProduct, category_names_cache_key
+
+# Nombres de categoría de productos, en cache por tienda.
+# La entrada de una tienda se borra al guardar/eliminar una de sus
+# CategoryProduct (ver apps/stores/models.py); el TTL es un respaldo.
+CATEGORY_NAMES_TTL = 3600
+
+
+def category_names_for(products):
+    """
+    {category_id: name} para las categorías de una lista de productos.
+    Las tiendas que no están en cache se cargan con una sola consulta.
+    """
+    store_ids = {p.get("store_id") for p in products if p.get("category")}
+    if not store_ids:
+        return {}
+
+    keys = {category_names_cache_key(store_id): store_id for store_id in store_ids}
+    cached = cache.get_many(list(keys))
+
+    names = {}
+    for per_store in cached.values():
+        names.update(per_store)
+
+    missing = [store_id for key, store_id in keys.items() if key not in cached]
+    if missing:
+        loaded = {store_id: {} for store_id in missing}
+        rows = CategoryProduct.objects.filter(store_id__in=missing).values_list("store_id", "id", "name")
+        for store_id, category_id, name in rows:
+            loaded[store_id][category_id] = name
+        cache.set_many(
+            {category_names_cache_key(store_id): per_store for store_id, per_store in loaded.items()},
+            CATEGORY_NAMES_TTL,
+        )
+        for per_store in loaded.values():
+            names.update(per_store)
+
+    return names
@@ -0,0 +1,107 @@
+"""
+Exportación del catálogo de una tienda (NDJSON o CSV) en streaming.
+
+Los productos se leen con un cursor por lotes y se emiten en bloques de
+texto, así la memoria es constante sin importar el tamaño del catálogo.
+El CSV tiene una fila por producto con el mismo formato de columnas que la
+importación (importer.py): las variantes van como JSON en la columna
+variants, así un CSV exportado se puede volver a importar.
+"""
+import csv
+import io
+import json
+import zlib
+
+from .products import products_collection
+
+EXPORT_BATCH_SIZE = 500
+CHUNK_SIZE = 64 * 1024
+
+EXPORT_FIELDS = (
+    "_id", "name", "slug", "sku", "barcode", "description", "price", "stock", "category",
+    "brand", "model", "condition", "is_active", "visibility", "discount_percentage",
+    "discount_start", "discount_end", "keywords", "tags", "options", "specifications",
+    "weight_kg", "dimensions_cm", "created_at", "updated_at",
+)
+LIST_FIELDS = ("keywords", "tags")
+JSON_FIELDS = ("options", "variants", "specifications", "dimensions_cm")
+CSV_FIELDS = EXPORT_FIELDS + ("variants",)
+
+CONTENT_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def store_products(store_id):
+    projection = {field: 1 for field in EXPORT_FIELDS}
+    projection["variants"] = 1
+    return (
+        products_collection.find({"store_id": store_id}, projection)
+        .sort("_id", 1)
+        .batch_size(EXPORT_BATCH_SIZE)
+    )
+
+
+def chunked(pieces):
+    """
+    Junta textos pequeños en bloques de ~CHUNK_SIZE.
+    """
+    buffer = []
+    size = 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= CHUNK_SIZE:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def ndjson_lines(store_id):
+    for product in store_products(store_id):
+        yield json.dumps(product, default=str, ensure_ascii=False) + "\n"
+
+
+def csv_cell(field, value):
+    if value is None:
+        return ""
+    if field in LIST_FIELDS:
+        return "|".join(str(v) for v in value)
+    if field in JSON_FIELDS or isinstance(value, (dict, list)):
+        return json.dumps(value, default=str, ensure_ascii=False)
+    return value
+
+
+def csv_lines(store_id):
+    out = io.StringIO()
+    writer = csv.writer(out)
+
+    def flush():
+        text = out.getvalue()
+        out.seek(0)
+        out.truncate()
+        return text
+
+    writer.writerow(CSV_FIELDS)
+    yield flush()
+
+    for product in store_products(store_id):
+        writer.writerow([csv_cell(field, product.get(field)) for field in CSV_FIELDS])
+        yield flush()
+
+
+def gzip_stream(chunks):
+    compressor = zlib.compressobj(wbits=31)  # 31: formato gzip
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_products(store_id, fmt="ndjson", gzip=False):
+    """
+    Generador de bloques (str, o bytes si gzip) con el catálogo de la tienda.
+    """
+    lines = csv_lines(store_id) if fmt == "csv" else ndjson_lines(store_id)
+    chunks = chunked(lines)
+    return gzip_stream(chunks) if gzip else chunks
@@ -0,0 +1,214 @@
+"""
+Importación masiva de productos (CSV o NDJSON) para una tienda.
+
+Las filas se leen en streaming y se procesan por lotes: cada fila se valida
+con las reglas de ProductSerializer, los datos de la tienda y el mapa de
+categorías se resuelven una sola vez, y cada lote se escribe con un
+insert_many no ordenado. La memoria queda acotada por el tamaño del lote y
+por MAX_REPORTED_ERRORS.
+
+Formato de las columnas CSV:
+  - keywords, tags: valores separados por "|"
+  - options, variants, specifications, dimensions_cm, media: JSON
+  - category: id o nombre de una categoría de la tienda
+"""
+import codecs
+import csv
+import json
+
+from pymongo.errors import BulkWriteError
+from rest_framework import serializers
+
+from apps.stores.models import CategoryProduct
+from .products import convert_dates, generate_random_slug, price_fields, products_collection
+from .serializers.serializersProduct import ProductSerializer, store_fields
+from ...utils.text import suggest_keys
+
+IMPORT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+SLUG_RETRIES = 3
+
+LIST_COLUMNS = ("keywords", "tags")
+JSON_COLUMNS = ("options", "variants", "specifications", "dimensions_cm", "media")
+
+
+def detect_format(filename, default="csv"):
+    name = (filename or "").lower()
+    if name.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    if name.endswith(".csv"):
+        return "csv"
+    return default
+
+
+def parse_csv_row(row):
+    data = {}
+    for key, value in row.items():
+        if key is None or value is None:
+            continue
+        key = key.strip()
+        value = value.strip()
+        if value == "":
+            continue
+        if key in LIST_COLUMNS:
+            value = [item.strip() for item in value.split("|") if item.strip()]
+        elif key in JSON_COLUMNS:
+            value = json.loads(value)
+        data[key] = value
+    return data
+
+
+def iter_rows(fileobj, fmt):
+    """
+    (número de fila, dict | excepción de parseo) en streaming desde un
+    archivo binario (upload de Django o open(path, "rb")).
+    Las filas se numeran desde 1 (sin contar el encabezado del CSV).
+    """
+    lines = codecs.iterdecode(fileobj, "utf-8-sig")  # fileobj abierto en binario
+    number = 0
+    # La decodificación es perezosa: un byte inválido aparece al iterar, y
+    # desde ahí no se puede seguir leyendo el archivo.
+    try:
+        if fmt == "csv":
+            for number, row in enumerate(csv.DictReader(lines), start=1):
+                try:
+                    yield number, parse_csv_row(row)
+                except ValueError as e:
+                    yield number, e
+        else:
+            for line in lines:
+                if not line.strip():
+                    continue
+                number += 1
+                try:
+                    row = json.loads(line)
+                    if not isinstance(row, dict):
+                        raise ValueError("cada línea debe ser un objeto JSON")
+                    yield number, row
+                except ValueError as e:
+                    yield number, e
+    except UnicodeDecodeError:
+        yield number + 1, ValueError("archivo no es UTF-8")
+
+
+class ProductImport:
+    """
+    Estado de una importación: datos de la tienda resueltos una vez y reporte.
+    """
+
+    def __init__(self, store, batch_size=IMPORT_BATCH_SIZE, dry_run=False):
+        self.store = store
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.store_data = store_fields(store)
+
+        categories = list(CategoryProduct.objects.filter(store=store).values_list("id", "name"))
+        self.category_ids = {category_id for category_id, _ in categories}
+        self.category_by_name = {name.strip().lower(): category_id for category_id, name in categories}
+
+        self.report = {"total": 0, "inserted": 0, "failed": 0, "errors": []}
+
+    def add_error(self, row_number, errors):
+        self.report["failed"] += 1
+        if len(self.report["errors"]) < MAX_REPORTED_ERRORS:
+            self.report["errors"].append({"row": row_number, "errors": errors})
+
+    def resolve_category(self, row):
+        value = row.get("category")
+        if value in (None, ""):
+            row.pop("category", None)
+            return
+        if isinstance(value, int) or str(value).isdigit():
+            if int(value) not in self.category_ids:
+                raise serializers.ValidationError({"category": "La categoría no pertenece a la tienda."})
+            row["category"] = int(value)
+            return
+        category_id = self.category_by_name.get(str(value).strip().lower())
+        if category_id is None:
+            raise serializers.ValidationError({"category": f"Categoría '{value}' no encontrada."})
+        row["category"] = category_id
+
+    def build(self, row_number, row):
+        """
+        Documento validado o None (el error queda en el reporte).
+        """
+        if isinstance(row, Exception):
+            self.add_error(row_number, {"row": str(row)})
+            return None
+        try:
+            row["store_id"] = self.store.id
+            self.resolve_category(row)
+            serializer = ProductSerializer(data=row)
+            serializer.is_valid(raise_exception=True)
+            doc = serializer.build_document(dict(serializer.validated_data), self.store_data)
+        except serializers.ValidationError as e:
+            self.add_error(row_number, e.detail)
+            return None
+        doc = convert_dates(doc)
+        doc.update(price_fields(doc))
+        doc["suggest"] = suggest_keys(doc.get("name"))
+        return doc
+
+    def run(self, rows):
+        batch = []
+        for row_number, row in rows:
+            self.report["total"] += 1
+            doc = self.build(row_number, row)
+            if doc is not None:
+                random_slug = not doc.get("slug")
+                if random_slug:
+                    doc["slug"] = generate_random_slug()
+                batch.append((row_number, doc, random_slug))
+            if len(batch) >= self.batch_size:
+                self.flush(batch)
+                batch = []
+        if batch:
+            self.flush(batch)
+        return self.report
+
+    def flush(self, batch):
+        if self.dry_run:
+            self.report["inserted"] += len(batch)
+            return
+
+        pending = batch
+        for attempt in range(SLUG_RETRIES + 1):
+            try:
+                products_collection.insert_many([doc for _, doc, _ in pending], ordered=False)
+                self.report["inserted"] += len(pending)
+                return
+            except BulkWriteError as e:
+                self.report["inserted"] += e.details.get("nInserted", 0)
+                write_errors = e.details.get("writeErrors", [])
+
+            # Los slugs aleatorios que chocaron se reintentan con otro slug
+            retry = []
+            for error in write_errors:
+                row_number, doc, random_slug = pending[error["index"]]
+                slug_conflict = error.get("code") == 11000 and is_slug_conflict_error(error)
+                if slug_conflict and random_slug and attempt < SLUG_RETRIES:
+                    doc["slug"] = generate_random_slug()
+                    retry.append((row_number, doc, random_slug))
+                elif slug_conflict:
+                    self.add_error(row_number, {"slug": "Ya existe un producto con este slug."})
+                else:
+                    self.add_error(row_number, {"row": error.get("errmsg", "Error al insertar")})
+            if not retry:
+                return
+            pending = retry
+
+
+def is_slug_conflict_error(write_error):
+    key_pattern = write_error.get("keyPattern")
+    if key_pattern is not None:
+        return "slug" in key_pattern
+    return "index: slug " in (write_error.get("errmsg") or "")
+
+
+def import_products(fileobj, store, fmt="csv", batch_size=IMPORT_BATCH_SIZE, dry_run=False):
+    """
+    Importa productos de fileobj a la tienda. Retorna el reporte:
+    {"total", "inserted", "failed", "errors": [{"row", "errors"}]}
+    """
+    job = ProductImport(store, batch_size=batch_size, dry_run=dry_run)
+    return job.run(iter_rows(fileobj, fmt))
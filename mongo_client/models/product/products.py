@@ -1,15 +1,22 @@
 from ...connection import mongo_db
+from ...utils.cursors import encode_cursor, decode_cursor, created_before, sorted_after
+from ...utils.text import suggest_keys
 from bson.objectid import ObjectId
+from pymongo.errors import DuplicateKeyError
 from PIL import Image
 from io import BytesIO
 from django.core.files.base import ContentFile
 import secrets
 import string
 from django.core.files.uploadedfile import InMemoryUploadedFile
-from datetime import datetime, date
+from datetime import datetime, date, time, timedelta
 from math import sqrt
 from math import sqrt, isfinite
 from datetime import date
+from django.core.cache import cache
+import hashlib
+import json
+import re
 import sys
 
 
@@ -39,19 +46,163 @@ def convert_dates(data):
             data[key] = [convert_dates(item) if isinstance(item, dict) else item for item in value]
     return data
 
+# El índice único "slug" (mongo_client/indexes.py) garantiza slugs únicos:
+# se inserta directamente y solo se reintenta si el slug aleatorio ya existía.
+SLUG_INSERT_ATTEMPTS = 5
+
+
+def is_slug_conflict(error):
+    details = error.details or {}
+    if "keyPattern" in details:
+        return "slug" in details["keyPattern"]
+    return "index: slug " in (details.get("errmsg") or "")
+
+
+# -------- precios efectivos ---------------------------------
+# effective_price (precio con el descuento vigente), min_price y max_price
+# (entre variantes) se guardan en el producto para poder filtrar y ordenar
+# por lo que paga el cliente con índices. price_refresh_at es la próxima
+# fecha en que el descuento empieza o termina; el comando
+# refresh_effective_prices (programado a diario, p. ej. con cron) recalcula
+# los productos cuya fecha ya pasó.
+PRICE_SOURCE_FIELDS = ("price", "variants", "discount_percentage", "discount_start", "discount_end")
+
+
+def as_date(value):
+    return value.date() if isinstance(value, datetime) else value
+
+
+def price_refresh_at(discount, start, end, today):
+    if not discount or not start or not end:
+        return None
+    start, end = as_date(start), as_date(end)
+    if today < start:
+        return datetime.combine(start, time.min)
+    if today <= end:
+        return datetime.combine(end + timedelta(days=1), time.min)
+    return None
+
+
+def price_fields(product, today=None):
+    """
+    Campos de precio materializados a partir de price, variants y el descuento.
+    """
+    today = today or date.today()
+    discount = product.get("discount_percentage")
+    start = product.get("discount_start")
+    end = product.get("discount_end")
+
+    effective = apply_discount(product.get("price"), discount, start, end, today)
+    prices = [
+        apply_discount(v.get("price") or product.get("price"), discount, start, end, today)
+        for v in product.get("variants") or []
+    ] or [effective]
+    prices = [p for p in prices if isinstance(p, (int, float))]
+
+    return {
+        "effective_price": effective if isinstance(effective, (int, float)) else None,
+        "min_price": min(prices, default=None),
+        "max_price": max(prices, default=None),
+        "price_refresh_at": price_refresh_at(discount, start, end, today),
+    }
+
+
+def current_effective_price(product, today=None):
+    """
+    effective_price guardado, o recalculado si falta o si el descuento cambió
+    desde el último refresh (el job todavía no pasó).
+    """
+    today = today or date.today()
+    stored = product.get("effective_price")
+    refresh_at = product.get("price_refresh_at")
+    if stored is not None and (refresh_at is None or refresh_at.date() > today):
+        return stored
+    return apply_discount(
+        product.get("price"),
+        product.get("discount_percentage"),
+        product.get("discount_start"),
+        product.get("discount_end"),
+        today,
+    )
+
+
+def price_fields_stages(update_data, today=None):
+    """
+    Pipeline de update_one que aplica update_data y recalcula los campos de
+    precio en la misma escritura (misma lógica que price_fields, en MQL).
+    """
+    today_start = datetime.combine(today or date.today(), time.min)
+    tomorrow = today_start + timedelta(days=1)
+
+    has_discount = {"$and": [
+        {"$gt": [{"$ifNull": ["$discount_percentage", 0]}, 0]},
+        {"$ne": [{"$ifNull": ["$discount_start", None]}, None]},
+        {"$ne": [{"$ifNull": ["$discount_end", None]}, None]},
+    ]}
+    active = {"$and": [
+        has_discount,
+        {"$lt": ["$discount_start", tomorrow]},
+        {"$gte": ["$discount_end", today_start]},
+    ]}
+
+    def discounted(price):
+        return {"$cond": [
+            {"$and": [active, {"$isNumber": price}]},
+            {"$round": [{"$multiply": [price, {"$subtract": [1, {"$divide": ["$discount_percentage", 100]}]}]}, 2]},
+            price,
+        ]}
+
+    effective = discounted("$price")
+    variant_prices = {"$map": {
+        "input": {"$ifNull": ["$variants", []]},
+        "as": "v",
+        "in": discounted({"$cond": [{"$gt": ["$$v.price", 0]}, "$$v.price", "$price"]}),
+    }}
+    numeric_prices = {"$filter": {"input": "$_prices", "cond": {"$isNumber": "$$this"}}}
+
+    return [
+        # $literal: los valores del usuario no se interpretan como expresiones
+        {"$set": {field: {"$literal": value} for field, value in update_data.items()}},
+        {"$set": {
+            "effective_price": {"$cond": [{"$isNumber": "$price"}, effective, None]},
+            "_prices": {"$cond": [
+                {"$gt": [{"$size": {"$ifNull": ["$variants", []]}}, 0]}, variant_prices, [effective]
+            ]},
+            "price_refresh_at": {"$cond": [has_discount, {"$switch": {
+                "branches": [
+                    {"case": {"$gte": ["$discount_start", tomorrow]},
+                     "then": {"$dateTrunc": {"date": "$discount_start", "unit": "day"}}},
+                    {"case": {"$gte": ["$discount_end", today_start]},
+                     "then": {"$dateAdd": {"startDate": {"$dateTrunc": {"date": "$discount_end", "unit": "day"}},
+                                           "unit": "day", "amount": 1}}},
+                ],
+                "default": None,
+            }}, None]},
+        }},
+        {"$set": {"min_price": {"$min": numeric_prices}, "max_price": {"$max": numeric_prices}}},
+        {"$unset": "_prices"},
+    ]
+
+
 def create_product(product_data):
     product = product_data.copy()
     product = convert_dates(product)  # Convertimos fechas antes del insert
+    product.update(price_fields(product))
+    product["suggest"] = suggest_keys(product.get("name"))  # autocompletado
+
+    # Slug automático si no viene; si viene del usuario no se cambia
+    random_slug = not product.get("slug")
+
+    for attempt in range(SLUG_INSERT_ATTEMPTS):
+        if random_slug:
+            product["slug"] = generate_random_slug()
+        try:
+            result = products_collection.insert_one(product)
+            break
+        except DuplicateKeyError as e:
+            if not random_slug or not is_slug_conflict(e) or attempt == SLUG_INSERT_ATTEMPTS - 1:
+                raise
 
-    # Generar slug automático si no viene
-    if not product.get("slug"):
-        slug = generate_random_slug()
-        # Asegurar que sea único
-        while products_collection.find_one({"slug": slug}):
-            slug = generate_random_slug()
-        product["slug"] = slug
-
-    result = products_collection.insert_one(product)
     product["_id"] = str(result.inserted_id)
     return product
 
@@ -67,11 +218,16 @@ def update_product(product_id, update_data):
     update_data: dict con los campos a actualizar
     """
     update_data = convert_dates(update_data)
+    if "name" in update_data:
+        update_data = {**update_data, "suggest": suggest_keys(update_data["name"])}
 
-    result = products_collection.update_one(
-        {"_id": ObjectId(product_id)},
-        {"$set": update_data}
-    )
+    if any(field in update_data for field in PRICE_SOURCE_FIELDS):
+        # Cambia el precio o el descuento: se recalcula en la misma escritura
+        update = price_fields_stages(update_data)
+    else:
+        update = {"$set": update_data}
+
+    result = products_collection.update_one({"_id": ObjectId(product_id)}, update)
     return result.modified_count
 
 def delete_product(product_id):
@@ -81,56 +237,183 @@ def delete_product(product_id):
     result = products_collection.delete_one({"_id": ObjectId(product_id)})
     return result.deleted_count
 
-"""
-Pasos (shell Mongo)
+# Los índices de products (2dsphere en store.location, texto en español, etc.)
+# están declarados en mongo_client/indexes.py:
+#     python manage.py ensure_mongo_indexes
 
-🧩 Paso 1: Crear índice de texto en la colección products
-// 0 · Entrar a la base correcta
-use marketplace          // ← pon el nombre real de tu base
+# -------- búsqueda de texto ---------------------------------
+# Los términos de 3+ caracteres usan el índice de texto ponderado
+# (name > brand/keywords > description). Los más cortos (prefijos de 1-2
+# letras mientras el usuario escribe) siguen usando regex.
+TEXT_SEARCH_MIN_LENGTH = 3
+TEXT_SEARCH_FIELDS = ("name", "description", "brand", "keywords")
+# Vida media de la recencia en el ranking: un producto de 30 días pesa la
+# mitad de "nuevo" que uno de hoy (la relevancia sigue dominando).
+RECENCY_HALF_LIFE_DAYS = 30
+
+
+def regex_filter(value):
+    return {"$regex": re.escape(value), "$options": "i"}
+
+
+def text_rank_stage():
+    """
+    _rank = textScore * (0.5 + 0.5 * 0.5^(edad_en_días / RECENCY_HALF_LIFE_DAYS))
+    """
+    age_days = {"$divide": [
+        {"$subtract": ["$$NOW", {"$ifNull": ["$created_at", "$$NOW"]}]},
+        86400000
+    ]}
+    recency = {"$pow": [0.5, {"$divide": [age_days, RECENCY_HALF_LIFE_DAYS]}]}
+    return {"$addFields": {"_rank": {"$multiply": [
+        {"$meta": "textScore"},
+        {"$add": [0.5, {"$multiply": [0.5, recency]}]}
+    ]}}}
+
+
+# Campos que devuelve el listado de productos
+LIST_PROJECTION = {
+    "name": 1,
+    "description": 1,
+    "price": 1,
+    "media": 1,
+    "category": 1,
+    "slug": 1,
+    "discount_percentage": 1,
+    "discount_start": 1,
+    "discount_end": 1,
+    "store": 1,
+    "_distance": 1,
+    "discounted_price": {"$literal": None},
+    "effective_price": 1,
+    "min_price": 1,
+    "max_price": 1,
+    "price_refresh_at": 1,
+    "stock": 1,
+    "sku":1,
+    "created_at": 1,
+}
+
+
+# -------- paginación por cursor -----------------------------
+# (ver mongo_client/utils/cursors.py) En vez de $skip se filtra por rango
+# sobre el orden del listado, así las páginas profundas cuestan lo mismo que
+# la primera y no se corren cuando entran productos nuevos.
+#   - "created": orden created_at desc, _id desc
+#   - "geo":     orden _distance asc, _id asc
+#   - "price":   orden por effective_price (filters["sort"] = "price" o "-price")
+# La búsqueda por texto ordena por un score que cambia con el tiempo; ahí se
+# sigue paginando por número de página (next_cursor es None).
+PRICE_SORTS = {"price": 1, "-price": -1}
+
+
+# -------- facetas -------------------------------------------
+# Conteos para los chips de filtro, calculados como ramas del $facet del
+# total (ver list_products). Se guardan unos segundos por filtro normalizado: las
+# páginas siguientes y las búsquedas repetidas no vuelven a calcularlas.
+FACETS_TTL = 60
+FACET_LIMIT = 20
+PRICE_BUCKETS = 5
+
+FACET_STAGES = {
+    "brands": [
+        {"$match": {"brand": {"$nin": [None, ""]}}},
+        {"$sortByCount": "$brand"},
+        {"$limit": FACET_LIMIT},
+    ],
+    "categories": [
+        {"$match": {"category": {"$ne": None}}},
+        {"$sortByCount": "$category"},
+        {"$limit": FACET_LIMIT},
+    ],
+    "store_categories": [
+        {"$match": {"store_category": {"$ne": None}}},
+        {"$sortByCount": "$store_category"},
+        {"$limit": FACET_LIMIT},
+    ],
+    "prices": [
+        {"$set": {"_price": {"$ifNull": ["$effective_price", "$price"]}}},
+        {"$match": {"_price": {"$type": "number"}}},
+        {"$bucketAuto": {"groupBy": "$_price", "buckets": PRICE_BUCKETS}},
+    ],
+}
+
+
+def facets_cache_key(base, search_regex, point):
+    """
+    Clave por filtro normalizado: el $match armado (sin cursor ni página),
+    el regex residual y el punto de búsqueda redondeado (~100 m). Se pasa a
+    minúsculas porque todos los filtros de texto ignoran mayúsculas.
+    """
+    if point:
+        point = [round(point[0], 3), round(point[1], 3)]
+    raw = json.dumps([base, search_regex, point], sort_keys=True, default=str).lower()
+    return "product_facets:" + hashlib.sha1(raw.encode()).hexdigest()
 
-// 1 · Índice geoespacial
-db.products.createIndex({ "store.location": "2dsphere" })
 
-// 2 · Índice de texto
-db.products.createIndex({
-  name:        "text",
-  description: "text",
-  brand:       "text",
-  keywords:    "text"
-}, { default_language: "spanish" })   // opcional
+def facet_counts(rows):
+    return [{"value": row["_id"], "count": row["count"]} for row in rows]
 
-// 3 · Verificar
-db.products.getIndexes()
 
+def facet_results(facet):
+    return {
+        "brands": facet_counts(facet.get("brands", [])),
+        "categories": facet_counts(facet.get("categories", [])),
+        "store_categories": facet_counts(facet.get("store_categories", [])),
+        "prices": [
+            {"min": row["_id"]["min"], "max": row["_id"]["max"], "count": row["count"]}
+            for row in facet.get("prices", [])
+        ],
+    }
 
-"""
 
 def list_products(
     store_id=None, country_id=None, city_id=None, neighborhood_id=None,
-    page=1, page_size=10, filters=None, lat=None, lon=None
+    page=1, page_size=10, filters=None, lat=None, lon=None,
+    with_count=True, count_limit=None, cursor=None, with_facets=False
 ):
+    """
+    Lista productos paginados. Con orden por índice (recientes, precio) la
+    página, el total y las facetas salen de una sola agregación; con orden
+    en memoria (texto, ubicación) la página va en una consulta top-k aparte.
+
+    - cursor: valor de "next_cursor" de la página anterior; reemplaza a page.
+      Con cursor no se recalcula el total ("count" es None).
+    - filters["sort"]: "price" / "-price" ordena por precio con descuento
+      (no aplica a la búsqueda por texto, que ordena por relevancia).
+
+    - with_count=False: no calcula el total (scroll infinito); "count" es None
+      y "next" se deduce pidiendo un documento de más.
+    - count_limit=N: cuenta como máximo N coincidencias ("count" se satura en N
+      y "count_capped" indica que hay al menos N).
+    - with_facets=True: agrega "facets" (marcas, categorías, categorías de
+      tienda e histograma de precios) sobre todo el filtro. Con cursor solo
+      se devuelven si siguen en cache (None si no); con count_limit se
+      calculan sobre las primeras count_limit coincidencias.
+    """
     base = {"is_active": True}
     if store_id:        base["store_id"]        = store_id
     if country_id:      base["country_id"]      = int(country_id)
     if city_id:         base["city_id"]         = int(city_id)
     if neighborhood_id: base["neighborhood_id"] = int(neighborhood_id)
 
+    geo = lat is not None and lon is not None
+
     # -------- filtros ---------------------------------------
     search = None
+    text_terms = []
+    price_sort = None
     if filters:
-        search = filters.get("search") or None
-
-        if filters.get("name"):
-            base["name"] = {"$regex": filters["name"], "$options": "i"}
+        search = (filters.get("search") or "").strip() or None
 
-        if filters.get("description"):
-            base["description"] = {"$regex": filters["description"], "$options": "i"}
-
-        if filters.get("brand"):
-            base["brand"] = {"$regex": filters["brand"], "$options": "i"}
-
-        if filters.get("keywords"):
-            base["keywords"] = {"$regex": filters["keywords"], "$options": "i"}
+        # Filtros por campo: el regex queda como filtro residual (con $text
+        # solo se evalúa sobre los candidatos del índice de texto).
+        for field in TEXT_SEARCH_FIELDS:
+            value = (filters.get(field) or "").strip()
+            if value:
+                base[field] = regex_filter(value)
+                if len(value) >= TEXT_SEARCH_MIN_LENGTH:
+                    text_terms.append(value)
 
         if filters.get("category") is not None:
             try:
@@ -144,7 +427,7 @@ def list_products(
             except ValueError:
                 pass
 
-        # Filtro por precio mínimo y máximo
+        # Filtro por precio mínimo y máximo (precio con el descuento vigente)
         price_filter = {}
         if filters.get("price_min") is not None:
             try:
@@ -159,83 +442,166 @@ def list_products(
                 pass
 
         if price_filter:
-            base["price"] = price_filter
+            # Los productos anteriores a effective_price (sin backfill con
+            # refresh_effective_prices --all) se filtran por price.
+            base.setdefault("$and", []).append({"$or": [
+                {"effective_price": price_filter},
+                {"effective_price": None, "price": price_filter},
+            ]})
+
+        price_sort = PRICE_SORTS.get(filters.get("sort"))
+
+    if search and len(search) >= TEXT_SEARCH_MIN_LENGTH:
+        text_terms.append(search)
+
+    # $text no se puede combinar con $geoNear: con ubicación se usa regex.
+    use_text = bool(text_terms) and not geo
+    if use_text:
+        base["$text"] = {"$search": " ".join(text_terms)}
+    search_regex = search if search and not (use_text and len(search) >= TEXT_SEARCH_MIN_LENGTH) else None
+
+    if use_text:
+        price_sort = None
+    cursor_mode = None if use_text else ("price" if price_sort else ("geo" if geo else "created"))
+
+    facets = None
+    facets_key = None
+    if with_facets:
+        point = [float(lon), float(lat)] if geo else None
+        facets_key = facets_cache_key(base, search_regex, point)
+        facets = cache.get(facets_key)
+    # Con cursor el filtro incluye el rango de la página: no sirve para facetas
+    need_facets = with_facets and facets is None and not cursor
+
+    after = None
+    if cursor:
+        if cursor_mode is None:
+            raise ValueError("la búsqueda por texto no admite cursor; usa page")
+        after = decode_cursor(cursor, cursor_mode)
+        with_count = False
+        if cursor_mode == "created":
+            base["$or"] = created_before(after)
+        elif cursor_mode == "price":
+            base["$or"] = sorted_after("effective_price", after, descending=price_sort < 0)
 
     # -------- pipeline ---------------------------------------
     pipe = []
 
-    if lat is not None and lon is not None:
+    if geo:
         pipe.append({
             "$geoNear": {
                 "near": {"type": "Point", "coordinates": [float(lon), float(lat)]},
                 "distanceField": "_distance",
                 "maxDistance": 1000,
                 "spherical": True,
-                "query": base
+                "query": base,
+                **({"minDistance": after[0]} if after and cursor_mode == "geo" else {}),
             }
         })
+        if after and cursor_mode == "geo":
+            last_distance, last_id = after
+            pipe.append({"$match": {"$or": [
+                {"_distance": {"$gt": last_distance}},
+                {"_distance": last_distance, "_id": {"$gt": last_id}},
+            ]}})
     else:
         pipe.append({"$match": base})
 
-    # búsqueda rápida
-    if search:
-        rgx = {"$regex": search, "$options": "i"}
-        pipe.append({"$match": {"$or": [
-            {"name": rgx},
-            {"description": rgx},
-            {"brand": rgx},
-            {"keywords": rgx}
-        ]}})
-
-    pipe += [
-        {"$sort": {"created_at": -1}},  # -1 para descendente, 1 para ascendente
-        {"$skip": (page - 1) * page_size},
-        {"$limit": page_size},
-        {"$project": {
-            "name": 1,
-            "description": 1,
-            "price": 1,
-            "media": 1,
-            "category": 1,
-            "slug": 1,
-            "discount_percentage": 1,
-            "discount_start": 1,
-            "discount_end": 1,
-            "store": 1,
-            "_distance": 1,
-            "discounted_price": {"$literal": None},
-            "stock": 1,
-            "sku":1,
-        }}
+    # búsqueda rápida (prefijos cortos o búsqueda por ubicación)
+    if search_regex:
+        rgx = regex_filter(search_regex)
+        pipe.append({"$match": {"$or": [{field: rgx} for field in TEXT_SEARCH_FIELDS]}})
+
+    if use_text:
+        # Relevancia combinada con recencia
+        sort_stages = [text_rank_stage(), {"$sort": {"_rank": -1, "_id": -1}}]
+    elif price_sort:
+        sort_stages = [{"$sort": {"effective_price": price_sort, "_id": price_sort}}]
+    elif geo:
+        sort_stages = [{"$sort": {"_distance": 1, "_id": 1}}]
+    else:
+        # _id desempata productos con el mismo created_at (necesario para el cursor)
+        sort_stages = [{"$sort": {"created_at": -1, "_id": -1}}]
+    # created_at y effective_price tienen índice; la relevancia de texto y lo
+    # que viene de $geoNear se ordenan en memoria.
+    indexed_sort = not use_text and not geo
+
+    skip = 0 if after else (page - 1) * page_size
+    # Un documento extra para saber si hay página siguiente sin depender del total
+    page_stages = [
+        {"$skip": skip},
+        {"$limit": page_size + 1},
+        {"$project": LIST_PROJECTION},
     ]
 
-    docs = list(products_collection.aggregate(pipe))
-    # Pipeline para contar total con todos los filtros aplicados (incluyendo search)
-    count_pipe = [p for p in pipe if "$match" in p or "$geoNear" in p]
-    count_pipe.append({"$count": "total"})
-
-    count_result = list(products_collection.aggregate(count_pipe))
-    total = count_result[0]["total"] if count_result else 0
-
+    # Total y facetas no dependen del orden
+    branches = {}
+    if with_count:
+        branches["total"] = [{"$count": "total"}]
+    if need_facets:
+        branches.update(FACET_STAGES)
+    # Acota el recorrido del total/facetas: nunca se leen más de count_limit
+    # coincidencias (o las necesarias para servir esta página).
+    limit_stage = [{"$limit": max(count_limit, skip + page_size + 1)}] if count_limit else []
+
+    facet = {}
+    if not branches:
+        docs = list(products_collection.aggregate(pipe + sort_stages + page_stages))
+    elif indexed_sort:
+        # El índice entrega los documentos ya ordenados: página, total y
+        # facetas en una sola pasada sobre $match.
+        branches["results"] = page_stages
+        facet = next(products_collection.aggregate(
+            pipe + sort_stages + limit_stage + [{"$facet": branches}]
+        ), {})
+        docs = facet.get("results", [])
+    else:
+        # Orden en memoria: la página va en su propia consulta para que
+        # $sort + $limit se resuelva como top-k; el total y las facetas se
+        # calculan aparte, sin ordenar.
+        docs = list(products_collection.aggregate(pipe + sort_stages + page_stages))
+        facet = next(products_collection.aggregate(pipe + limit_stage + [{"$facet": branches}]), {})
+
+    total = None
+    capped = False
+    if with_count:
+        total = facet["total"][0]["total"] if facet.get("total") else 0
+        if count_limit and total >= count_limit:
+            total = count_limit
+            capped = True
+    if need_facets:
+        facets = facet_results(facet)
+        cache.set(facets_key, facets, FACETS_TTL)
+
+    has_next = len(docs) > page_size
+    docs = docs[:page_size]
+
+    next_cursor = None
+    if has_next and cursor_mode:
+        last = docs[-1]
+        value = last.get({"geo": "_distance", "price": "effective_price"}.get(cursor_mode, "created_at"))
+        # effective_price puede faltar (productos sin backfill): sorted_after maneja null
+        if value is not None or cursor_mode == "price":
+            next_cursor = encode_cursor(cursor_mode, value, last["_id"])
 
     today = date.today()
     for d in docs:
         d["_id"] = str(d["_id"])
-        d["discounted_price"] = apply_discount(
-            d["price"],
-            d.get("discount_percentage"),
-            d.get("discount_start"),
-            d.get("discount_end"),
-            today
-        )
+        d["discounted_price"] = current_effective_price(d, today)
+        d.pop("price_refresh_at", None)
 
-    return {
+    result = {
         "results": docs,
         "count": total,
+        "count_capped": capped,
         "page_size": page_size,
-        "next": page * page_size < total,
-        "previous": page > 1,
+        "next": has_next,
+        "previous": bool(after) or page > 1,
+        "next_cursor": next_cursor,
     }
+    if with_facets:
+        result["facets"] = facets
+    return result
 
 
 
@@ -1,10 +1,13 @@
 from rest_framework import serializers
 from django.utils.timezone import now
 from datetime import datetime, date
-from ..products import create_product, apply_discount  # Lógica para guardar en MongoDB
+from ..products import create_product, apply_discount, current_effective_price, is_slug_conflict  # Lógica para guardar en MongoDB
+from pymongo.errors import DuplicateKeyError
 from apps.stores.models import Store
 import uuid
+import copy
 from apps.stores.models import CategoryProduct
+from ..categories import category_names_for
 
 class DateFromMongoField(serializers.DateField):
     def to_representation(self, value):
@@ -12,6 +15,29 @@ class DateFromMongoField(serializers.DateField):
             value = value.date()
         return super().to_representation(value)
 
+def store_fields(store):
+    """
+    Campos de la tienda que se copian en cada producto.
+    """
+    fields = {
+        "store_category": store.category_id,
+        "store": {
+            "name": store.name,
+            "logo": store.logo.url if store.logo else "",
+            "slug": store.slug,
+        },
+        "country_id": store.country_id,
+        "city_id": store.city_id,
+        "neighborhood_id": store.neighborhood_id,
+    }
+    if store.location and store.location.x is not None and store.location.y is not None:
+        fields["store"]["location"] = {
+            "type": "Point",
+            "coordinates": [store.location.x, store.location.y]
+        }
+    return fields
+
+
 class ProductOptionSerializer(serializers.Serializer):
     name = serializers.CharField()
     values = serializers.ListField(child=serializers.CharField())
@@ -158,13 +184,9 @@ class ProductSerializer(serializers.Serializer):
 
     def get_category_name(self, obj):
             category_id = obj.get('category')
-            if category_id:
-                try:
-                    category = CategoryProduct.objects.get(id=category_id)
-                    return category.name
-                except CategoryProduct.DoesNotExist:
-                    return None
-            return None
+            if not category_id:
+                return None
+            return category_names_for([obj]).get(category_id)
 
     def to_representation(self, instance):
         ret = super().to_representation(instance)
@@ -176,10 +198,8 @@ class ProductSerializer(serializers.Serializer):
         end = instance.get('discount_end')
         today = date.today()
 
-        # Precio con descuento
-        ret['discounted_price'] = apply_discount(
-            instance.get('price'), discount, start, end, today
-        )
+        # Precio con descuento (materializado en effective_price)
+        ret['discounted_price'] = current_effective_price(instance, today)
 
         # Precio con descuento para cada variante
         if 'variants' in ret:
@@ -282,8 +302,11 @@ class ProductSerializer(serializers.Serializer):
 
         return data
 
-    def create(self, validated_data):
-        store_id = validated_data.get("store_id")
+    def build_document(self, validated_data, store_data):
+        """
+        Documento listo para insertar a partir de validated_data y los campos
+        de la tienda (store_fields). Lo usan create y la importación masiva.
+        """
         product_price = validated_data.get("price")
         variants = validated_data.get("variants", [])
 
@@ -310,35 +333,7 @@ class ProductSerializer(serializers.Serializer):
                 default=product_price
             )
 
-
-        try:
-            store = Store.objects.get(id=store_id)
-        except Store.DoesNotExist:
-            raise serializers.ValidationError("Tienda no encontrada")
-
-        validated_data["store_category"] = store.category.id if store.category else None
-        lat = store.location.y if store.location else None
-        lon = store.location.x if store.location else None
-
-        location_data = None
-        if store.location and store.location.x is not None and store.location.y is not None:
-            location_data = {
-                "type": "Point",
-                "coordinates": [store.location.x, store.location.y]
-            }
-
-        validated_data["store"] = {
-            "name": store.name,
-            "logo": store.logo.url if store.logo else "",
-            "slug": store.slug,
-        }
-
-        if location_data:
-            validated_data["store"]["location"] = location_data
-
-        validated_data["country_id"] = store.country.id if store.country else None
-        validated_data["city_id"] = store.city.id if store.city else None
-        validated_data["neighborhood_id"] = store.neighborhood.id if store.neighborhood else None
+        validated_data.update(copy.deepcopy(store_data))
 
         now = datetime.utcnow()
         validated_data["created_at"] = now
@@ -359,10 +354,32 @@ class ProductSerializer(serializers.Serializer):
             unique_id = uuid.uuid4().hex[:6].upper()
             validated_data["sku"] = f"{name_fragment}-{unique_id}"
 
-        return create_product(validated_data)
+        return validated_data
+
+    def create(self, validated_data):
+        store_id = validated_data.get("store_id")
+
+        try:
+            store = Store.objects.get(id=store_id)
+        except Store.DoesNotExist:
+            raise serializers.ValidationError("Tienda no encontrada")
+
+        validated_data = self.build_document(validated_data, store_fields(store))
+
+        try:
+            return create_product(validated_data)
+        except DuplicateKeyError as e:
+            if is_slug_conflict(e):
+                raise serializers.ValidationError({"slug": "Ya existe un producto con este slug."})
+            raise
 
     # UPDATE
     def update(self, instance, validated_data):
         from ..products import update_product, get_product
-        update_product(str(instance["_id"]), validated_data)
+        try:
+            update_product(str(instance["_id"]), validated_data)
+        except DuplicateKeyError as e:
+            if is_slug_conflict(e):
+                raise serializers.ValidationError({"slug": "Ya existe un producto con este slug."})
+            raise
         return get_product(str(instance["_id"]))
\ No newline at end of file
@@ -0,0 +1,145 @@
+"""
+Descuento de inventario al crear una orden.
+
+Cada línea de la orden (producto + sku) se descuenta con un update_one
+condicionado a que haya stock suficiente (stock >= cantidad; en variantes,
+con arrayFilters sobre variants.sku). No hay bloqueo global: si dos órdenes
+compiten por el mismo stock, la condición la evalúa MongoDB sobre el
+documento y solo una de las dos pasa.
+
+Las líneas se aplican en orden y se revisa matched_count de cada una. Si una
+no pasa (sin stock o producto borrado), exactamente las líneas ya aplicadas
+se devuelven con un $inc positivo.
+"""
+import logging
+
+from bson.objectid import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+
+from .products import products_collection
+
+logger = logging.getLogger(__name__)
+
+STOCK_PROJECTION = {"sku": 1, "name": 1, "variants.sku": 1}
+
+
+class StockError(Exception):
+    """
+    Una línea de la orden no se pudo reservar (sin stock, producto o sku inexistente).
+    """
+
+    def __init__(self, line, message=None):
+        self.line = line
+        super().__init__(message or f"Stock insuficiente para {line['name'] or line['sku']}.")
+
+
+def order_lines(items):
+    """
+    Líneas de inventario a partir de los CartItem: una por (producto, sku),
+    sumando cantidades. Los items sin ObjectId válido (como "combo-1") no
+    descuentan stock; los productos de un combo sí, cada uno con su sku.
+    """
+    lines = {}
+    for item in items:
+        if not ObjectId.is_valid(item.product_id):
+            continue
+        key = (item.product_id, item.sku)
+        if key in lines:
+            lines[key]["quantity"] += item.quantity
+        else:
+            lines[key] = {
+                "product_id": item.product_id,
+                "sku": item.sku,
+                "name": item.product_name,
+                "quantity": item.quantity,
+            }
+    return list(lines.values())
+
+
+def line_update(line, product, amount, reserve=False):
+    """
+    (filtro, update, array_filters) que suma amount al stock de la línea (y
+    al stock global del producto si es una variante). Con reserve el filtro
+    exige stock >= -amount.
+    """
+    sku = line["sku"]
+    query = {"_id": product["_id"]}
+    variants = product.get("variants") or []
+
+    if variants:
+        if not any(v.get("sku") == sku for v in variants):
+            raise StockError(line, f"Variante {sku} no encontrada.")
+        if reserve:
+            query["variants"] = {"$elemMatch": {"sku": sku, "stock": {"$gte": -amount}}}
+        update = {"$inc": {"variants.$[v].stock": amount, "stock": amount}}
+        return query, update, [{"v.sku": sku}]
+
+    if product.get("sku") != sku:
+        raise StockError(line, f"SKU {sku} inválido para el producto.")
+    if reserve:
+        query["sku"] = sku
+        query["stock"] = {"$gte": -amount}
+    return query, {"$inc": {"stock": amount}}, None
+
+
+def load_products(lines):
+    ids = list({ObjectId(line["product_id"]) for line in lines})
+    return {str(p["_id"]): p for p in products_collection.find({"_id": {"$in": ids}}, STOCK_PROJECTION)}
+
+
+def reserve_stock(lines):
+    """
+    Descuenta el stock de todas las líneas o de ninguna.
+    Lanza StockError con la primera línea que no se pudo reservar.
+    """
+    if not lines:
+        return
+    products = load_products(lines)
+
+    # Se arman todas las actualizaciones antes de escribir (sku inválido, etc.)
+    updates = []
+    for line in lines:
+        product = products.get(line["product_id"])
+        if product is None:
+            raise StockError(line, f"Producto {line['name'] or line['product_id']} no encontrado.")
+        updates.append((line, line_update(line, product, -line["quantity"], reserve=True)))
+
+    applied = []
+    try:
+        for line, (query, update, array_filters) in updates:
+            result = products_collection.update_one(query, update, array_filters=array_filters)
+            if not result.matched_count:
+                raise StockError(line)
+            applied.append(line)
+    except (StockError, PyMongoError):
+        release_stock(applied, products)
+        raise
+
+
+def release_stock(lines, products=None):
+    """
+    Devuelve al inventario el stock de las líneas (compensación o cancelación).
+    """
+    if not lines:
+        return
+    if products is None:
+        products = load_products(lines)
+
+    operations = []
+    for line in lines:
+        product = products.get(line["product_id"])
+        if product is None:
+            continue  # Producto eliminado: no hay stock que devolver
+        try:
+            query, update, array_filters = line_update(line, product, line["quantity"])
+        except StockError:
+            logger.warning("No se pudo devolver stock de %s (%s)", line["product_id"], line["sku"])
+            continue
+        operations.append(UpdateOne(query, update, array_filters=array_filters))
+    if not operations:
+        return
+    try:
+        products_collection.bulk_write(operations, ordered=False)
+    except PyMongoError:
+        logger.exception("Error devolviendo stock: %s", lines)
@@ -0,0 +1,94 @@
+import random
+import threading
+
+from cachetools import TTLCache
+
+from apps.stores.models import Category
+from ...connection import mongo_db
+
+# Tips aleatorios por categoría (pantalla de inicio, muy frecuente).
+# Cache en memoria del proceso con TTL: los tips de cada categoría y el
+# conjunto de slugs válidos. Las categorías con muchos tips no se cachean
+# completas; para esas se usa $sample en MongoDB.
+tips_collection = mongo_db["tips"]
+
+TIPS_TTL = 300           # segundos
+TIPS_CACHE_MAX = 200     # tips por categoría que se guardan en memoria
+CATEGORIES_TTL = 600
+MISSING_CATEGORY_TTL = 60  # slugs inexistentes: una consulta por slug y minuto
+
+TIP_PROJECTION = {"contenido": 1, "categoria_slug": 1, "categoria_name": 1,
+                  "categoria_type": 1, "created_at": 1, "updated_at": 1}
+
+_tips_cache = TTLCache(maxsize=256, ttl=TIPS_TTL)  # slug -> [tips] | None (usar $sample)
+_category_cache = TTLCache(maxsize=1, ttl=CATEGORIES_TTL)
+_missing_categories = TTLCache(maxsize=1024, ttl=MISSING_CATEGORY_TTL)
+_lock = threading.Lock()
+
+
+def category_slugs():
+    with _lock:
+        slugs = _category_cache.get("slugs")
+    if slugs is None:
+        slugs = frozenset(Category.objects.values_list("slug", flat=True))
+        with _lock:
+            _category_cache["slugs"] = slugs
+    return slugs
+
+
+def is_valid_category(slug):
+    slugs = category_slugs()
+    if slug in slugs:
+        return True
+    with _lock:
+        if slug in _missing_categories:
+            return False
+    # Puede ser una categoría creada después de llenar la cache
+    if Category.objects.filter(slug=slug).exists():
+        with _lock:
+            _category_cache["slugs"] = slugs | {slug}
+        return True
+    with _lock:
+        _missing_categories[slug] = True
+    return False
+
+
+def load_category_tips(slug):
+    """
+    Tips de la categoría si caben en memoria; None si son demasiados.
+    """
+    tips = list(tips_collection.find({"categoria_slug": slug}, TIP_PROJECTION).limit(TIPS_CACHE_MAX + 1))
+    if len(tips) > TIPS_CACHE_MAX:
+        return None
+    for tip in tips:
+        tip["_id"] = str(tip["_id"])
+    return tips
+
+
+def random_tip(slug):
+    """
+    Un tip al azar de la categoría, o None si no tiene tips.
+    """
+    with _lock:
+        cached = _tips_cache.get(slug, False)
+    if cached is False:
+        cached = load_category_tips(slug)
+        with _lock:
+            _tips_cache[slug] = cached
+
+    if cached is not None:
+        return dict(random.choice(cached)) if cached else None
+
+    tip = next(tips_collection.aggregate([
+        {"$match": {"categoria_slug": slug}},
+        {"$sample": {"size": 1}},
+        {"$project": TIP_PROJECTION},
+    ]), None)
+    if tip:
+        tip["_id"] = str(tip["_id"])
+    return tip
+
+
+def forget_category_tips(slug):
+    with _lock:
+        _tips_cache.pop(slug, None)
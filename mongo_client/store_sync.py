@@ -0,0 +1,122 @@
+"""
+Sincronización de los datos de la tienda embebidos en MongoDB.
+
+Productos y posts guardan una copia de datos de la Store (nombre, logo, slug,
+ubicación, categoría). Cuando esos campos cambian en Postgres se reescriben
+con update_many por store_id:
+
+- apps/stores/signals.py detecta el cambio y llama a schedule_store_sync,
+  que corre después del commit y fuera del request (hilo aparte).
+- python manage.py resync_store_embeds repara todas las tiendas por lotes.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import close_old_connections, transaction
+from pymongo import UpdateMany
+
+from .connection import mongo_db
+
+logger = logging.getLogger(__name__)
+
+products_collection = mongo_db["products"]
+posts_collection = mongo_db["post"]
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="store-sync")
+
+
+# Campos de Store (attname) copiados en productos y posts
+EMBED_FIELDS = frozenset({
+    "name", "logo", "slug", "location", "category_id", "country_id", "city_id", "neighborhood_id",
+})
+
+
+def store_embed_snapshot(store):
+    """
+    Valores de la Store que se copian a productos y posts (para detectar cambios).
+    None si alguno está diferido (.only()/.defer()): leerlo costaría una consulta.
+    """
+    if store.get_deferred_fields() & EMBED_FIELDS:
+        return None
+    location = store.location
+    return (
+        store.name,
+        store.logo.name if store.logo else "",
+        store.slug,
+        (location.x, location.y) if location else None,
+        store.category_id,
+        store.country_id,
+        store.city_id,
+        store.neighborhood_id,
+    )
+
+
+def product_store_update(store):
+    fields = {
+        "store.name": store.name,
+        "store.logo": store.logo.url if store.logo else "",
+        "store.slug": store.slug,
+        "store_category": store.category_id,
+        "country_id": store.country_id,
+        "city_id": store.city_id,
+        "neighborhood_id": store.neighborhood_id,
+    }
+    if store.location:
+        fields["store.location"] = {"type": "Point", "coordinates": [store.location.x, store.location.y]}
+        return {"$set": fields}
+    return {"$set": fields, "$unset": {"store.location": ""}}
+
+
+def post_store_update(store):
+    return {"$set": {
+        "store.name": store.name,
+        "store.logo": store.logo.url if store.logo else "",
+        "store.slug": store.slug,
+        "store.category": store.category_id,
+        "store.country": store.country_id,
+        "store.city": store.city_id,
+        "store.neighborhood": store.neighborhood_id,
+    }}
+
+
+def store_sync_operations(store):
+    """
+    (operación sobre products, operación sobre post) para una tienda.
+    """
+    return (
+        UpdateMany({"store_id": store.id}, product_store_update(store)),
+        UpdateMany({"store_id": store.id}, post_store_update(store)),
+    )
+
+
+def sync_store_embeds(store_id):
+    """
+    Reescribe los datos embebidos de una tienda. Retorna (productos, posts) modificados.
+    """
+    from apps.stores.models import Store
+
+    store = Store.objects.filter(id=store_id).first()
+    if store is None:
+        return 0, 0
+
+    product_op, post_op = store_sync_operations(store)
+    products = products_collection.bulk_write([product_op]).modified_count
+    posts = posts_collection.bulk_write([post_op]).modified_count
+    return products, posts
+
+
+def _run_sync(store_id):
+    try:
+        products, posts = sync_store_embeds(store_id)
+        logger.info("Store %s sincronizada: %s productos, %s posts", store_id, products, posts)
+    except Exception:
+        logger.exception("Error sincronizando datos embebidos de la store %s", store_id)
+    finally:
+        close_old_connections()
+
+
+def schedule_store_sync(store_id):
+    """
+    Programa la sincronización para después del commit, fuera del request.
+    """
+    transaction.on_commit(lambda: _executor.submit(_run_sync, store_id))
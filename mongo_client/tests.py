@@ -0,0 +1,103 @@
+import io
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock, skipUnless
+
+from bson import ObjectId
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase, override_settings
+from pymongo.errors import PyMongoError
+
+from .connection import get_client, get_db
+from .indexes import ensure_collection_indexes
+from apps.stores.models import Store
+from .models.post.likes import post_likes_collection, posts_collection, toggle_like
+from .models.product.exporter import export_products
+from .models.product.importer import ProductImport, iter_rows
+
+# Base de datos propia para las pruebas: se crea y se borra en cada test
+TEST_DB_NAME = f"{settings.MONGO_DB_NAME or 'marketplace'}_test"
+
+
+def mongo_available():
+    if not settings.MONGO_URI:
+        return False
+    try:
+        get_client().admin.command("ping")
+        return True
+    except PyMongoError:
+        return False
+
+
+@skipUnless(mongo_available(), "MongoDB no disponible")
+@override_settings(MONGO_DB_NAME=TEST_DB_NAME)
+class ToggleLikeConcurrencyTests(SimpleTestCase):
+    USERS = 20
+    TOGGLES_PER_USER = 6
+    THREADS = 16
+
+    def setUp(self):
+        get_client().drop_database(TEST_DB_NAME)
+        ensure_collection_indexes("post_likes", db=get_db())
+        self.post_id = ObjectId()
+        posts_collection.insert_one({"_id": self.post_id, "likes": 0, "store": {}})
+        self.addCleanup(get_client().drop_database, TEST_DB_NAME)
+
+    def test_counter_matches_like_documents_under_concurrency(self):
+        # Los toques de un mismo usuario se reparten entre hilos distintos
+        toggles = [user_id for _ in range(self.TOGGLES_PER_USER) for user_id in range(self.USERS)]
+        with ThreadPoolExecutor(max_workers=self.THREADS) as pool:
+            results = list(pool.map(lambda user_id: toggle_like(self.post_id, user_id), toggles))
+
+        self.assertNotIn(None, results)
+
+        likes = posts_collection.find_one({"_id": self.post_id})["likes"]
+        documents = post_likes_collection.count_documents({"post_id": self.post_id})
+        self.assertEqual(likes, documents)
+
+        duplicates = list(post_likes_collection.aggregate([
+            {"$match": {"post_id": self.post_id}},
+            {"$group": {"_id": "$user_id", "n": {"$sum": 1}}},
+            {"$match": {"n": {"$gt": 1}}},
+        ]))
+        self.assertEqual(duplicates, [])
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ExportImportRoundTripTests(TestCase):
+
+    def setUp(self):
+        self.store = Store.objects.create(name="Tienda")
+        self.product = {
+            "_id": ObjectId(),
+            "name": "Camisa",
+            "sku": "CAM-1",
+            "price": 10000.0,
+            "stock": 8,
+            "is_active": True,
+            "tags": ["algodón", "verano"],
+            "options": [{"name": "Talla", "values": ["S", "M"]}],
+            "variants": [
+                {"sku": "CAM-1-S", "price": 10000.0, "stock": 3, "options": {"Talla": "S"}},
+                {"sku": "CAM-1-M", "price": 12000.0, "stock": 5, "options": {"Talla": "M"}},
+            ],
+        }
+
+    def export_csv(self):
+        with mock.patch("mongo_client.models.product.exporter.store_products",
+                        return_value=[self.product]):
+            return "".join(export_products(self.store.id, fmt="csv"))
+
+    def test_exported_csv_imports_back_with_its_variants(self):
+        rows = list(iter_rows(io.BytesIO(self.export_csv().encode("utf-8")), "csv"))
+        self.assertEqual(len(rows), 1)
+
+        job = ProductImport(self.store)
+        doc = job.build(*rows[0])
+
+        self.assertEqual(job.report["errors"], [])
+        self.assertEqual(doc["variants"], self.product["variants"])
+        self.assertEqual(doc["options"], self.product["options"])
+        self.assertEqual(doc["tags"], self.product["tags"])
+        self.assertEqual(doc["stock"], 8)
+        self.assertEqual(doc["price"], 10000.0)
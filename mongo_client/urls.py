@@ -10,6 +10,8 @@ from .views.product.products import (ProductListCreateView,
                                     DeleteProductView,
                                     ProductUpdateAPIView,
                                     DeleteProductImageView,
+                                    ProductImportView,
+                                    ProductExportView,
                                     )
 from .views.post.posts import (PostCreateView,
                                StorePostListView, 
@@ -27,9 +29,12 @@ from .views.post.posts import (PostCreateView,
 from .views.post.media_upload import PostMediaUploadView, PostMediaDeleteView
 from .views.comentsProcduct.comments import comment_create_view, comments_list_view
 from .views.suggestion.suggestion import TipCreateView, RandomTipByCategoryView
+from .views.health.health import MongoReadinessView
 
 urlpatterns = [
     path('create-product/', ProductListCreateView.as_view(), name='product-list-create'),
+    path('products/import/', ProductImportView.as_view(), name='product-import'),
+    path('store/<int:store_id>/export/', ProductExportView.as_view(), name='product-export'),
     path('product/<str:product_id>/', ProductDetailView.as_view(), name='product-detail'),
     path('store/<int:store_id>/', list_products_by_store, name='list-products-by-store'),
     path('all-products/', list_all_products, name='list-products'),
@@ -72,6 +77,9 @@ urlpatterns = [
     path('comments/posts/<str:post_id>/', comments_list_view, name='comments'),
     path('toggle-like/<post_id>/', ToggleLikePostView.as_view(), name='lik-dislike'),
 
+    #Readiness (MongoDB + índices declarados)
+    path('health/ready/', MongoReadinessView.as_view(), name='mongo-readiness'),
+
 
 
 ]
\ No newline at end of file
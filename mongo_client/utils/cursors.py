@@ -0,0 +1,74 @@
+import base64
+import json
+from datetime import datetime
+
+from bson import ObjectId
+
+
+# Cursores opacos para paginación por rango (keyset).
+# El cursor es base64 de {"m": modo, "v": valor, "id": _id} del último
+# documento de la página; el modo indica qué valor de orden guarda:
+#   - "created": created_at (datetime)
+#   - "geo":     _distance (float)
+#   - "price":   effective_price (float)
+
+def encode_cursor(mode, value, _id):
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps({"m": mode, "v": value, "id": str(_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, mode):
+    """
+    Retorna (valor, ObjectId). ValueError si el cursor no es válido o es de otro modo.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        if data["m"] != mode:
+            raise ValueError
+        value = data["v"]
+        if mode == "created":
+            value = datetime.fromisoformat(value)
+        elif value is not None:  # "price" admite null (producto sin effective_price)
+            value = float(value)
+        elif mode != "price":
+            raise ValueError
+        return value, ObjectId(data["id"])
+    except Exception:
+        raise ValueError("cursor inválido")
+
+
+def created_before(cursor_value):
+    """
+    Filtro "después de este cursor" para el orden created_at desc, _id desc.
+    """
+    last_created, last_id = cursor_value
+    return [
+        {"created_at": {"$lt": last_created}},
+        {"created_at": last_created, "_id": {"$lt": last_id}},
+    ]
+
+
+def sorted_after(field, cursor_value, descending=False):
+    """
+    Filtro "después de este cursor" para el orden field, _id (ambos en el
+    mismo sentido). MongoDB ordena null (o campo ausente) antes que los
+    números: primero en orden ascendente, al final en descendente.
+    """
+    last_value, last_id = cursor_value
+    op = "$lt" if descending else "$gt"
+    if last_value is None:
+        after = [{field: None, "_id": {op: last_id}}]
+        if not descending:
+            after.append({field: {"$ne": None}})
+        return after
+
+    after = [
+        {field: {op: last_value}},
+        {field: last_value, "_id": {op: last_id}},
+    ]
+    if descending:
+        after.append({field: None})
+    return after
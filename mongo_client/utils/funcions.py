@@ -44,4 +44,4 @@ def compress_image(file, max_size=1024, quality=75):
         None
     )
 
-    return compressed_file, new_name
\ No newline at end of file
+    return compressed_file, new_name
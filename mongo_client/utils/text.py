@@ -0,0 +1,41 @@
+import re
+import unicodedata
+
+# Normalización de texto para el autocompletado (sin dependencias de
+# Django ni PIL: lo usan modelos, la importación y los comandos).
+#
+# Productos y tiendas guardan sus claves de autocompletado al escribirse:
+# los prefijos (edge n-grams) de cada palabra del nombre normalizado.
+# Buscar "cami ro" es pedir los documentos que tengan "cami" y "ro".
+# Los prefijos de una letra no se guardan: casi todos los nombres los
+# tienen y la consulta no sería selectiva en ningún índice.
+SUGGEST_MIN_PREFIX = 2
+SUGGEST_MAX_PREFIX = 15
+
+
+def normalize_text(value):
+    """
+    Minúsculas, sin tildes y con espacios simples: "Café  Ñandú" -> "cafe nandu".
+    """
+    value = unicodedata.normalize("NFKD", str(value or ""))
+    value = "".join(c for c in value if not unicodedata.combining(c))
+    return " ".join(re.findall(r"\w+", value.lower()))
+
+
+def suggest_tokens(value):
+    """
+    Palabras buscables: las de SUGGEST_MIN_PREFIX letras o más, recortadas a SUGGEST_MAX_PREFIX.
+    """
+    return [token[:SUGGEST_MAX_PREFIX] for token in normalize_text(value).split()
+            if len(token) >= SUGGEST_MIN_PREFIX]
+
+
+def suggest_keys(value):
+    """
+    Claves a guardar: todos los prefijos de cada palabra.
+    """
+    keys = set()
+    for token in suggest_tokens(value):
+        for size in range(SUGGEST_MIN_PREFIX, len(token) + 1):
+            keys.add(token[:size])
+    return sorted(keys)
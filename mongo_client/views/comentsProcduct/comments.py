@@ -13,7 +13,9 @@ def comment_create_view(request):
     if not data.get("post_id") or not data.get("content"):
         return Response({"error": "post_id y content son requeridos."}, status=400)
 
-    comment, user = create_comment(data)
+    comment, user = create_comment(data, user=request.user)
+    if comment is None:
+        return Response({"error": "Post no encontrado"}, status=404)
 
     return Response({
         "message": "Comentario creado",
@@ -22,7 +24,7 @@ def comment_create_view(request):
             "content": comment["content"],
             "created_at": comment["created_at"],
             "username": comment["user_name"],
-            "initials": user.initials if hasattr(user, "initials") else comment["user_name"][:2].upper()
+            "initials": comment["user_initials"]
         }
     })
     
@@ -35,14 +37,20 @@ def comments_list_view(request, post_id):
     page = int(request.GET.get('page', 1))
     page_size = int(request.GET.get('page_size', 10))
 
-    comments, total = get_post_comments(post_id, page, page_size)
+    cursor = request.GET.get('cursor') or None
+
+    try:
+        comments, total, next_cursor = get_post_comments(post_id, page, page_size, cursor=cursor)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=400)
     serializer = CommentSerializer(comments, many=True)
 
     return Response({
         "results": serializer.data,
         "count": total,
         "page_size": page_size,
-        "next": page * page_size < total,
-        "previous": page > 1,
+        "next": next_cursor is not None,
+        "previous": bool(cursor) or page > 1,
+        "next_cursor": next_cursor,
     })
 
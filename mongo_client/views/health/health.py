@@ -0,0 +1,28 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.permissions import AllowAny
+from pymongo.errors import PyMongoError
+
+from ...connection import get_client
+from ...indexes import indexes_ready
+
+
+class MongoReadinessView(APIView):
+    """
+    Readiness: MongoDB responde y existen todos los índices declarados.
+    """
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def get(self, request):
+        try:
+            get_client().admin.command("ping")
+        except PyMongoError as e:
+            return Response({"ready": False, "error": str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        ready, missing = indexes_ready()
+        return Response(
+            {"ready": ready, "missing_indexes": missing},
+            status=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE
+        )
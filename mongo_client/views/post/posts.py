@@ -10,7 +10,11 @@ from django.core.paginator import Paginator
 from rest_framework.pagination import PageNumberPagination
 import math
 from bson import ObjectId
-from ...models.post.post import process_post_with_absolute_media, get_post_by_id
+from ...models.post.post import (process_post_with_absolute_media, get_post_by_id,
+                                 paginate_posts, get_posts_by_ids)
+from ...models.post.feed import public_feed_ids, normalize_seed, invalidate_public_feed
+from ...models.post.likes import (toggle_like, liked_post_ids, user_liked_post_ids,
+                                  count_user_likes, delete_post_likes)
 from .recommendation import recommend_similar_posts
 import random
 posts_collection = mongo_db["post"]
@@ -18,6 +22,17 @@ posts_collection = mongo_db["post"]
 
 PAGE_SIZE = 10 
 
+
+def posts_context(request, posts):
+    """
+    Contexto de PostSerializer para una página: resuelve is_liked de todos
+    los posts con una sola consulta a post_likes.
+    """
+    context = {"request": request}
+    if request.user.is_authenticated:
+        context["liked_post_ids"] = liked_post_ids(request.user.id, [p["_id"] for p in posts])
+    return context
+
 class PostPagination(PageNumberPagination):
     page_size = 10
     page_size_query_param = 'page_size'
@@ -55,29 +70,21 @@ class StorePostListView(APIView):
     def get(self, request, store_id):
         page = int(request.GET.get("page", 1))
 
-        posts = list(
-            posts_collection.find({"store_id": store_id}).sort("created_at", -1)
+        current_page_posts, total_posts, total_pages = paginate_posts(
+            {"store_id": store_id}, page, PAGE_SIZE
         )
-
-        paginator = Paginator(posts, PAGE_SIZE)
-
-        if page > paginator.num_pages:
+        if current_page_posts is None:
             return Response({"error": "Página fuera de rango"}, status=404)
 
-        current_page_posts = paginator.page(page).object_list
-        
-        for p in current_page_posts:
-            p.setdefault("liked_by", [])
-        
         # Procesar media con URL absoluta
         processed_posts = [process_post_with_absolute_media(p, request) for p in current_page_posts]
 
-        serializer = PostSerializer(processed_posts, many=True, context={"request": request})
+        serializer = PostSerializer(processed_posts, many=True, context=posts_context(request, processed_posts))
 
         return Response({
             "page": page,
-            "total_pages": paginator.num_pages,
-            "total_posts": paginator.count,
+            "total_pages": total_pages,
+            "total_posts": total_posts,
             "posts": serializer.data,
         })
 
@@ -86,41 +93,10 @@ class ToggleLikePostView(APIView):
 
     def post(self, request, post_id):
         try:
-            post = posts_collection.find_one({"_id": ObjectId(post_id)})
-            if not post:
+            result = toggle_like(post_id, request.user.id)
+            if result is None:
                 return Response({"error": "Post no encontrado"}, status=404)
-
-            user_id = request.user.id
-            liked_by = post.get("liked_by", [])
-
-            if user_id in liked_by:
-                # Quitar like
-                posts_collection.update_one(
-                    {"_id": ObjectId(post_id)},
-                    {
-                        "$pull": {"liked_by": user_id},
-                        "$inc": {"likes": -1}
-                    }
-                )
-                updated_post = posts_collection.find_one({"_id": ObjectId(post_id)})
-                return Response({
-                    "is_liked": False,
-                    "likes": updated_post.get("likes", 0)
-                })
-            else:
-                # Agregar like
-                posts_collection.update_one(
-                    {"_id": ObjectId(post_id)},
-                    {
-                        "$addToSet": {"liked_by": user_id},
-                        "$inc": {"likes": 1}
-                    }
-                )
-                updated_post = posts_collection.find_one({"_id": ObjectId(post_id)})
-                return Response({
-                    "is_liked": True,
-                    "likes": updated_post.get("likes", 0)
-                })
+            return Response(result)
         except Exception as e:
             return Response({"error": str(e)}, status=500)
         
@@ -171,6 +147,8 @@ class PostDeleteView(APIView):
         result = posts_collection.delete_one({"_id": ObjectId(post_id)})
 
         if result.deleted_count == 1:
+            delete_post_likes(post_id)
+            invalidate_public_feed()
             return Response(status=status.HTTP_204_NO_CONTENT)
         else:
             return Response({"detail": "Error al eliminar."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -182,31 +160,27 @@ class LikedPostsView(APIView):
         page = int(request.GET.get("page", 1))
         user_id = request.user.id
 
-        # Buscar todos los posts donde este usuario ha dado like
-        posts = list(
-            posts_collection.find({
-                "liked_by": {"$in": [user_id]}
-            }).sort("created_at", -1)
-        )
-
-        paginator = Paginator(posts, PAGE_SIZE)
-
-        if page > paginator.num_pages and paginator.num_pages > 0:
+        # Posts que le gustan al usuario, del like más reciente al más antiguo
+        total_posts = count_user_likes(user_id)
+        total_pages = max(1, math.ceil(total_posts / PAGE_SIZE))
+        if page < 1 or page > total_pages:
             return Response({"error": "Página fuera de rango"}, status=404)
 
-        current_page_posts = paginator.page(page).object_list
-
-        for p in current_page_posts:
-            p.setdefault("liked_by", [])  # Por seguridad
+        post_ids = user_liked_post_ids(user_id, skip=(page - 1) * PAGE_SIZE, limit=PAGE_SIZE)
+        current_page_posts = get_posts_by_ids(post_ids)
 
         processed_posts = [process_post_with_absolute_media(p, request) for p in current_page_posts]
 
-        serializer = PostSerializer(processed_posts, many=True, context={"request": request})
+        # Todos los posts de esta lista le gustan al usuario
+        serializer = PostSerializer(processed_posts, many=True, context={
+            "request": request,
+            "liked_post_ids": {p["_id"] for p in processed_posts},
+        })
 
         return Response({
             "page": page,
-            "total_pages": paginator.num_pages,
-            "total_posts": paginator.count,
+            "total_pages": total_pages,
+            "total_posts": total_posts,
             "posts": serializer.data,
         })
     
@@ -219,7 +193,7 @@ class RecommendedPostsView(APIView):
 
         result = recommend_similar_posts(request.user, page, limit)
         processed = [process_post_with_absolute_media(p, request) for p in result["posts"]]
-        serializer = PostSerializer(processed, many=True, context={"request": request})
+        serializer = PostSerializer(processed, many=True, context=posts_context(request, processed))
 
         return Response({
             "page": result["page"],
@@ -235,28 +209,23 @@ class PublicPostsView(APIView):
         page = int(request.GET.get("page", 1))
         limit = int(request.GET.get("limit", PAGE_SIZE))
 
-        # Puedes usar un filtro más sofisticado si lo deseas
-        posts = list(
-            posts_collection.find({})
-            .sort("created_at", -1)
-            .limit(100)
-        )
-
-        random.shuffle(posts)  # Para que no siempre vean los mismos
+        # Misma semilla => mismo orden; el cliente la reenvía al pedir más páginas
+        seed = normalize_seed(request.GET.get("seed"))
+        ids = public_feed_ids(seed)
 
-        paginator = Paginator(posts, limit)
-        page = min(page, paginator.num_pages or 1)
-        page_posts = paginator.page(page).object_list
-
-        for p in page_posts:
-            p.setdefault("liked_by", [])
+        total_posts = len(ids)
+        total_pages = max(1, math.ceil(total_posts / limit))
+        page = max(1, min(page, total_pages))
+        start = (page - 1) * limit
+        page_posts = get_posts_by_ids([ObjectId(pid) for pid in ids[start:start + limit]])
 
         processed = [process_post_with_absolute_media(p, request) for p in page_posts]
-        serializer = PostSerializer(processed, many=True, context={"request": request})
+        serializer = PostSerializer(processed, many=True, context=posts_context(request, processed))
 
         return Response({
             "page": page,
-            "total_pages": paginator.num_pages,
-            "total_posts": paginator.count,
+            "seed": seed,
+            "total_pages": total_pages,
+            "total_posts": total_posts,
             "posts": serializer.data,
-        })
\ No newline at end of file
+        })
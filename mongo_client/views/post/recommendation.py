@@ -1,102 +1,96 @@
 from ...connection import mongo_db
+from ...models.post.likes import liked_post_ids
+from ...models.post.interests import get_user_interests, top_interests
+from ...models.post.post import get_posts_by_ids
+from .scoring import CANDIDATE_PROJECTION, rank_candidates, user_seed
 posts_collection = mongo_db["post"]
-from collections import Counter
-from django.core.paginator import Paginator
-from collections import defaultdict
-import random
-
-# sistema de recomendaciones basado en reglas
-# recomendaciones usando reglas inteligentes (tienda, categoría, ubicación).
-
-def get_liked_posts_by_user(user):
-    return list(
-        posts_collection.find({
-            "liked_by": {"$in": [user.id]}
-        })
-    )
-
-def build_user_profile(user):
-    liked_posts = get_liked_posts_by_user(user)
-    if not liked_posts:
+import math
+from bson import ObjectId
+from django.core.cache import cache
+
+# Candidatos que se puntúan por usuario
+MAX_CANDIDATES = 5000
+RECOMMENDATION_TTL = 300  # segundos
+
+# sistema de recomendaciones: candidatos por reglas (tienda, categoría, ubicación)
+# ordenados con un puntaje vectorizado (ver scoring.py).
+
+def profile_from_interests(interests):
+    """
+    Top 3 por dimensión del perfil de intereses (mantenido en cada like/unlike).
+    """
+    if not interests:
         return None
 
-    store_ids = Counter()
-    categories = Counter()
-    countries = Counter()
-    cities = Counter()
-    neighborhoods = Counter()
+    profile = {
+        "top_store_ids": top_interests(interests, "stores"),
+        "top_categories": top_interests(interests, "categories"),
+        "top_countries": top_interests(interests, "countries"),
+        "top_cities": top_interests(interests, "cities"),
+        "top_neighborhoods": top_interests(interests, "neighborhoods"),
+    }
+    if not any(profile.values()):
+        return None
+    return profile
 
-    for post in liked_posts:
-        store = post.get("store", {})
-        store_ids[store.get("_id")] += 1
-        categories[store.get("category")] += 1
-        countries[store.get("country")] += 1
-        cities[store.get("city")] += 1
-        neighborhoods[store.get("neighborhood")] += 1
 
-    return {
-        "top_store_ids": [s for s, _ in store_ids.most_common(3)],
-        "top_categories": [c for c, _ in categories.most_common(3)],
-        "top_countries": [c for c, _ in countries.most_common(3)],
-        "top_cities": [c for c, _ in cities.most_common(3)],
-        "top_neighborhoods": [n for n, _ in neighborhoods.most_common(3)],
-    }
+def build_user_profile(user):
+    return profile_from_interests(get_user_interests(user.id))
+
+
+def ranked_post_ids(user, interests, profile):
+    """
+    Ids (str) de los candidatos ya puntuados para el usuario. Se guardan en
+    cache unos minutos: todas las páginas salen del mismo ranking.
+    """
+    seed = user_seed(user.id)
+    key = f"recommended:{user.id}:{seed}"
+    ids = cache.get(key)
+    if ids is not None:
+        return ids
+
+    # Cada rama del $or usa su propio índice (ver post en mongo_client/indexes.py)
+    branches = [
+        ("store_id", profile["top_store_ids"]),
+        ("store.category", profile["top_categories"]),
+        ("store.country", profile["top_countries"]),
+        ("store.city", profile["top_cities"]),
+        ("store.neighborhood", profile["top_neighborhoods"]),
+    ]
+    query = {"$or": [{field: {"$in": values}} for field, values in branches if values]}
+
+    candidates = list(
+        posts_collection.find(query, CANDIDATE_PROJECTION)
+        .sort("created_at", -1)
+        .limit(MAX_CANDIDATES)
+    )
+    # Los posts que ya le gustan se descartan sobre los candidatos (a lo sumo
+    # MAX_CANDIDATES ids), no con un $nin de todos los likes del usuario
+    liked = liked_post_ids(user.id, [p["_id"] for p in candidates])
+    candidates = [p for p in candidates if str(p["_id"]) not in liked]
+    ids = [str(p["_id"]) for p in rank_candidates(candidates, interests, seed)]
+    cache.set(key, ids, RECOMMENDATION_TTL)
+    return ids
 
 
 def recommend_similar_posts(user, page=1, limit=100):
-    profile = build_user_profile(user)
+    interests = get_user_interests(user.id)
+    profile = profile_from_interests(interests)
     if not profile:
         return {"posts": [], "page": 1, "total_pages": 0, "total_posts": 0}
 
-    query = {
-        "liked_by": {"$ne": user.id},
-        "$or": [
-            {"store_id": {"$in": profile["top_store_ids"]}},
-            {"store.category": {"$in": profile["top_categories"]}},
-            {"store.country": {"$in": profile["top_countries"]}},
-            {"store.city": {"$in": profile["top_cities"]}},
-            {"store.neighborhood": {"$in": profile["top_neighborhoods"]}},
-        ]
-    }
-
-    # Cargar más posts para poder aplicar aleatoriedad
-    all_posts = list(posts_collection.find(query).limit(100))  # Límite amplio
-    random.shuffle(all_posts)  # Desordenar el orden
-
-    # ✅ Eliminar duplicados por _id
-    seen = set()
-    unique_posts = []
-    for post in all_posts:
-        pid = str(post.get('_id'))
-        if pid not in seen:
-            seen.add(pid)
-            unique_posts.append(post)
-
-    # (Opcional) Limitar a máximo N posts por tienda
-    max_per_store = 3
-    grouped = defaultdict(list)
-    balanced_posts = []
-
-    for post in unique_posts:
-        store_id = post.get("store_id")
-        if len(grouped[store_id]) < max_per_store:
-            grouped[store_id].append(post)
-            balanced_posts.append(post)
-
-    # Paginación después de mezclar y balancear
-    paginator = Paginator(balanced_posts, limit)
-    if page > paginator.num_pages and paginator.num_pages > 0:
-        page = paginator.num_pages
-
-    page_posts = paginator.page(page).object_list
+    ids = ranked_post_ids(user, interests, profile)
 
-    # Asegurar consistencia
-    for p in page_posts:
-        p.setdefault("liked_by", [])
+    # Paginación sobre el ranking (determinista por usuario y día)
+    total_posts = len(ids)
+    total_pages = max(1, math.ceil(total_posts / limit))
+    page = max(1, min(page, total_pages))
+    start = (page - 1) * limit
+    page_posts = get_posts_by_ids([ObjectId(pid) for pid in ids[start:start + limit]])
 
     return {
         "posts": page_posts,
         "page": page,
-        "total_pages": paginator.num_pages,
-        "total_posts": paginator.count,
+        "total_pages": total_pages,
+        "total_posts": total_posts,
     }
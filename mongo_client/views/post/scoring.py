@@ -0,0 +1,120 @@
+import zlib
+from datetime import datetime
+
+import numpy as np
+
+# Puntaje vectorizado de candidatos para recommend_similar_posts.
+# Cada candidato tiene 5 features en [0, 1]; el puntaje es la suma ponderada
+# más un ruido pequeño con semilla fija por usuario y día (mismo orden en
+# todas las páginas del día). Luego se re-ordena por diversidad de tiendas.
+
+WEIGHTS = {
+    "store": 0.30,      # afinidad con la tienda (likes previos a esa tienda)
+    "category": 0.20,   # afinidad con la categoría de la tienda
+    "geo": 0.15,        # cercanía: mismo barrio > misma ciudad > mismo país
+    "recency": 0.20,    # decae con la edad del post
+    "velocity": 0.15,   # likes por hora desde la publicación
+}
+JITTER = 0.05
+RECENCY_TAU_DAYS = 7
+# Cercanía por nivel de ubicación: (dimensión del perfil, campo de store, peso)
+GEO_LEVELS = (
+    ("neighborhoods", "neighborhood", 1.0),
+    ("cities", "city", 0.6),
+    ("countries", "country", 0.25),
+)
+# Cada post adicional de la misma tienda multiplica su puntaje por este factor
+DIVERSITY_DECAY = 0.7
+MAX_PER_STORE = 3
+
+# Campos del post que usa el scoring
+CANDIDATE_PROJECTION = {"store_id": 1, "store": 1, "likes": 1, "created_at": 1}
+
+
+def user_seed(user_id, day=None):
+    day = day or datetime.utcnow().date()
+    return zlib.crc32(f"{user_id}:{day.isoformat()}".encode())
+
+
+def affinity(values, counts):
+    """
+    counts[str(id)] / max(counts) para cada valor (0 si no hay interés).
+    """
+    positive = {key: count for key, count in (counts or {}).items() if count > 0}
+    if not positive:
+        return np.zeros(len(values))
+    top = max(positive.values())
+    return np.array([positive.get(str(v), 0) for v in values], dtype=float) / top
+
+
+def candidate_features(posts, interests, now=None):
+    """
+    Matriz (n, 5) de features en el orden de WEIGHTS.
+    """
+    now = now or datetime.utcnow()
+    stores = [p.get("store") or {} for p in posts]
+
+    store_aff = affinity([p.get("store_id") for p in posts], interests.get("stores"))
+    category_aff = affinity([s.get("category") for s in stores], interests.get("categories"))
+
+    geo = np.zeros(len(posts))
+    for dim, field, weight in GEO_LEVELS:
+        match = affinity([s.get(field) for s in stores], interests.get(dim)) > 0
+        geo = np.maximum(geo, match * weight)
+
+    age_hours = np.array(
+        [(now - (p.get("created_at") or now)).total_seconds() / 3600 for p in posts], dtype=float
+    ).clip(min=0)
+    recency = np.exp(-age_hours / (24 * RECENCY_TAU_DAYS))
+
+    likes = np.array([p.get("likes") or 0 for p in posts], dtype=float).clip(min=0)
+    velocity = np.log1p(likes / (age_hours + 2))
+    if velocity.max(initial=0) > 0:
+        velocity /= velocity.max()
+
+    return np.column_stack([store_aff, category_aff, geo, recency, velocity])
+
+
+def score_candidates(features, seed):
+    weights = np.array(list(WEIGHTS.values()))
+    rng = np.random.default_rng(seed)
+    return features @ weights + JITTER * rng.random(len(features))
+
+
+def diversify(scores, store_ids):
+    """
+    Índices de los candidatos en el orden final: cada aparición repetida de
+    una tienda multiplica el puntaje por DIVERSITY_DECAY y a partir de
+    MAX_PER_STORE se descarta.
+    """
+    if not len(scores):
+        return np.array([], dtype=int)
+    order = np.argsort(-scores, kind="stable")
+    _, store_codes = np.unique(np.array([str(s) for s in store_ids]), return_inverse=True)
+    ranked_codes = store_codes[order]
+
+    # Ocurrencia de cada tienda dentro del orden (0 para su mejor post)
+    by_store = np.argsort(ranked_codes, kind="stable")
+    sorted_codes = ranked_codes[by_store]
+    group_start = np.r_[0, np.flatnonzero(np.diff(sorted_codes)) + 1]
+    group_sizes = np.diff(np.r_[group_start, len(sorted_codes)])
+    occurrence_sorted = np.arange(len(sorted_codes)) - np.repeat(group_start, group_sizes)
+    occurrence = np.empty_like(occurrence_sorted)
+    occurrence[by_store] = occurrence_sorted
+
+    keep = occurrence < MAX_PER_STORE
+    adjusted = scores[order] * DIVERSITY_DECAY ** occurrence
+    final = np.argsort(-adjusted[keep], kind="stable")
+    return order[keep][final]
+
+
+def rank_candidates(posts, interests, seed, now=None):
+    """
+    Candidatos ordenados por puntaje con diversidad de tiendas.
+    """
+    if not posts:
+        return []
+    features = candidate_features(posts, interests, now)
+    scores = score_candidates(features, seed)
+    order = diversify(scores, [p.get("store_id") for p in posts])
+    return [posts[i] for i in order]
@@ -12,6 +12,9 @@ from mongo_client.models.product.products import (create_product,
                                                   )
 from rest_framework.decorators import api_view, permission_classes
 from .files import save_product_file
+from ...models.product.importer import import_products, detect_format
+from ...models.product.exporter import export_products, CONTENT_TYPES
+from django.http import StreamingHttpResponse
 from rest_framework.parsers import MultiPartParser
 from ...connection import mongo_db
 import os
@@ -22,13 +25,37 @@ from django.db.models import Q
 
 products_collection = mongo_db["products"]
 
+
+def count_options(params):
+    """
+    Opciones de conteo del listado desde query params:
+    ?with_count=false omite el total (scroll infinito), ?count_limit=1000 lo acota,
+    ?facets=true agrega las facetas (marcas, categorías, precios).
+    ValueError si count_limit no es un entero positivo (las vistas responden 400).
+    """
+    with_count = str(params.get("with_count", "true")).lower() not in ("false", "0")
+    count_limit = params.get("count_limit")
+    if count_limit in (None, "", "null"):
+        count_limit = None
+    elif not str(count_limit).isdigit() or int(count_limit) < 1:
+        raise ValueError("count_limit debe ser un entero positivo")
+    else:
+        count_limit = int(count_limit)
+    with_facets = str(params.get("facets", "false")).lower() in ("true", "1")
+    return {"with_count": with_count, "count_limit": count_limit, "with_facets": with_facets}
+
+
 class ProductListCreateView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
         store_id = request.query_params.get("store_id")
         filters = request.query_params.dict()
-        result = list_products(store_id, filters=filters)
+        try:
+            result = list_products(store_id, filters=filters, cursor=request.query_params.get("cursor") or None,
+                                   **count_options(request.query_params))
+        except ValueError as e:  # cursor o count_limit inválidos
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         result["results"] = process_products_with_images(result["results"], request)
         return Response(result)
 
@@ -165,6 +192,7 @@ def list_products_by_store(request, store_id):
             "category": request.GET.get("category"),
             "price_min": request.GET.get("price_min"),
             "price_max": request.GET.get("price_max"),
+            "sort": request.GET.get("sort"),
             "keywords": request.GET.get("keywords"),
             "search": request.GET.get("search"), 
         }
@@ -172,7 +200,11 @@ def list_products_by_store(request, store_id):
         # Eliminar los filtros que son None
         filters = {k: v for k, v in filters.items() if v is not None}
 
-        data = list_products(store_id=int(store_id), page=page, page_size=page_size, filters=filters)
+        try:
+            data = list_products(store_id=int(store_id), page=page, page_size=page_size, filters=filters,
+                                 cursor=request.GET.get("cursor") or None, **count_options(request.GET))
+        except ValueError as e:  # cursor o count_limit inválidos
+            return Response({"error": str(e)}, status=400)
 
         data["results"] = process_products_with_images(data["results"], request)
 
@@ -195,6 +227,7 @@ def list_all_products(request):
             "category": request.GET.get("category"),
             "price_min": request.GET.get("price_min"),
             "price_max": request.GET.get("price_max"),
+            "sort": request.GET.get("sort"),
             "keywords": request.GET.get("keywords"),
             "search": request.GET.get("search"),
             "store_category": request.GET.get("store_category"),
@@ -211,16 +244,21 @@ def list_all_products(request):
         lat = float(lat) if lat not in (None, "", "null") else None
         lon = float(lon) if lon not in (None, "", "null") else None
 
-        data = list_products(
-            country_id=country_id,
-            city_id=city_id,
-            neighborhood_id=neighborhood_id,
-            page=page,
-            page_size=page_size,
-            filters=filters,
-            lat=lat,
-            lon=lon
-        )
+        try:
+            data = list_products(
+                country_id=country_id,
+                city_id=city_id,
+                neighborhood_id=neighborhood_id,
+                page=page,
+                page_size=page_size,
+                filters=filters,
+                lat=lat,
+                lon=lon,
+                cursor=request.GET.get("cursor") or None,
+                **count_options(request.GET)
+            )
+        except ValueError as e:  # cursor o count_limit inválidos
+            return Response({"error": str(e)}, status=400)
 
         data["results"] = process_products_with_images(data["results"], request)
 
@@ -351,4 +389,68 @@ class DeleteStoreProductsView(APIView):
         return Response(
             {"deleted": deleted_count},
             status=status.HTTP_200_OK
-        )
\ No newline at end of file
+        )
+
+class ProductImportView(APIView):
+    """
+    Importación masiva: multipart con "file" (CSV o NDJSON) y "store_id".
+    Responde con el reporte por fila (ver models/product/importer.py).
+    """
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        upload = request.FILES.get("file")
+        store_id = request.data.get("store_id")
+        if not upload or not store_id:
+            return Response({"error": "Se requieren 'file' y 'store_id'."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            store = Store.objects.get(id=store_id)
+        except Store.DoesNotExist:
+            return Response({"error": "Tienda no encontrada"}, status=status.HTTP_404_NOT_FOUND)
+
+        if not store.administrators.filter(id=request.user.id).exists():
+            return Response({"error": "No tienes permiso para crear productos en esta tienda."}, status=status.HTTP_403_FORBIDDEN)
+
+        fmt = request.data.get("format") or detect_format(upload.name)
+        if fmt not in ("csv", "ndjson"):
+            return Response({"error": "Formato no soportado (csv o ndjson)."}, status=status.HTTP_400_BAD_REQUEST)
+
+        dry_run = str(request.data.get("dry_run", "false")).lower() in ("true", "1")
+        report = import_products(upload, store, fmt=fmt, dry_run=dry_run)
+
+        return Response(
+            report,
+            status=status.HTTP_207_MULTI_STATUS if report["failed"] else status.HTTP_201_CREATED
+        )
+
+
+class ProductExportView(APIView):
+    """
+    Exporta el catálogo completo de una tienda en streaming.
+    ?format=ndjson|csv (por defecto ndjson), ?gzip=1 para comprimir.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, store_id):
+        try:
+            store = Store.objects.get(id=store_id)
+        except Store.DoesNotExist:
+            return Response({"error": "Tienda no encontrada"}, status=status.HTTP_404_NOT_FOUND)
+
+        if not store.administrators.filter(id=request.user.id).exists():
+            return Response({"error": "No tienes permiso para exportar esta tienda."}, status=status.HTTP_403_FORBIDDEN)
+
+        fmt = request.GET.get("format", "ndjson")
+        if fmt not in CONTENT_TYPES:
+            return Response({"error": "Formato no soportado (csv o ndjson)."}, status=status.HTTP_400_BAD_REQUEST)
+        gzip = request.GET.get("gzip", "").lower() in ("1", "true")
+
+        filename = f"{store.slug}-productos.{fmt}" + (".gz" if gzip else "")
+        response = StreamingHttpResponse(
+            export_products(store.id, fmt=fmt, gzip=gzip),
+            content_type="application/gzip" if gzip else CONTENT_TYPES[fmt],
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
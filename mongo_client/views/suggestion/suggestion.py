@@ -1,11 +1,9 @@
-import random
-
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 
-from apps.stores.models import Category
 from ...models.suggestion.TipSerializer import TipSerializer
+from ...models.suggestion.tips import random_tip, is_valid_category, forget_category_tips
 from ...connection import mongo_db
 tips_collection = mongo_db["tips"]
 
@@ -14,21 +12,19 @@ class TipCreateView(APIView):
         serializer = TipSerializer(data=request.data, context={"collection": tips_collection})
         if serializer.is_valid():
             tip = serializer.save()
+            forget_category_tips(tip["categoria_slug"])
             return Response(tip, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
 class RandomTipByCategoryView(APIView):
     def get(self, request, slug):
-        try:
-            categoria = Category.objects.get(slug=slug)
-        except Category.DoesNotExist:
+        # Slugs y tips salen de la cache del proceso (ver models/suggestion/tips.py)
+        if not is_valid_category(slug):
             return Response({"error": "Categoría no válida"}, status=status.HTTP_400_BAD_REQUEST)
 
-        tips = list(tips_collection.find({"categoria_slug": slug}))
-        if not tips:
+        tip = random_tip(slug)
+        if not tip:
             return Response({"message": "No hay tips para esta categoría"}, status=status.HTTP_404_NOT_FOUND)
 
-        tip = random.choice(tips)
-        tip["_id"] = str(tip["_id"])
         return Response(tip)